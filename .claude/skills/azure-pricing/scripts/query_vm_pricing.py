@@ -8,136 +8,478 @@ Queries Azure Retail Prices API and produces:
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
-import requests
+import os
 import sys
-from typing import Dict, List, Optional, Any
-from collections import defaultdict
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+# Keep compiled kernels in a stable per-user location so the JIT cost is
+# paid once rather than on every invocation of this short-lived script
+os.environ.setdefault(
+    "NUMBA_CACHE_DIR", str(Path.home() / ".cache" / "azure-pricing" / "numba")
+)
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    # numba is optional; organize_prices falls back to a pure-Python reduction
+    np = None
+    njit = None
+
+try:
+    import httpx
+except ImportError:
+    # httpx is optional; pages are then fetched with a pooled requests.Session
+    httpx = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # orjson is optional; fall back to the stdlib decoder
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        """Encode to UTF-8 JSON bytes, matching orjson.dumps."""
+        return json.dumps(obj).encode()
+
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; the fallback client then decodes whole pages
+    ijson = None
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is optional; cache entries are then stored as plain JSON
+    zstandard = None
 
 
 HOURS_PER_YEAR = 8760
 
+PRICES_API_URL = "https://prices.azure.com/api/retail/prices"
 
-def query_azure_prices(
-    sku: str,
-    currency: str = "USD",
-    regions: Optional[List[str]] = None
-) -> List[Dict[str, Any]]:
+# Per-region price slots used by organize_prices, in output order
+PRICE_KEYS = (
+    "linux_consumption",
+    "windows_consumption",
+    "spot",
+    "reserved_1yr",
+    "reserved_3yr",
+)
+LINUX_CONSUMPTION, WINDOWS_CONSUMPTION, SPOT, RESERVED_1YR, RESERVED_3YR = range(len(PRICE_KEYS))
+N_PRICE_SLOTS = len(PRICE_KEYS)
+DROP = -1  # Price kind for records that are not reported
+
+# Values of the API "type" field
+SPOT_TYPE = "Spot"
+RESERVATION_TYPE = "Reservation"
+
+# On-disk cache of API responses
+CACHE_DIR = Path.home() / ".cache" / "azure-pricing"
+CACHE_TTL_SECONDS = 6 * 60 * 60
+CACHE_COMPRESSION_LEVEL = 3
+
+# Upper bound on in-flight requests against the Retail Prices API
+MAX_CONCURRENT_REQUESTS = 8
+
+# Read size when streaming a page through ijson
+STREAM_CHUNK_SIZE = 64 * 1024
+
+if httpx is None:
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    # Shared session so every page reuses pooled, gzip-encoded connections
+    _SESSION = requests.Session()
+    _SESSION.headers.update({"Accept-Encoding": "gzip", "Accept": "application/json"})
+    _SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+    # Errors that end pagination of a query in the fallback client; ValueError
+    # covers a malformed page decoded whole (orjson/json decode errors)
+    _FETCH_ERRORS = (requests.exceptions.RequestException, ValueError)
+    if ijson is not None:
+        _FETCH_ERRORS += (ijson.JSONError,)
+
+
+@dataclass(slots=True)
+class RegionPrices:
+    """Lowest price of each type in a region (None when not offered)."""
+    linux_consumption: Optional[float] = None
+    windows_consumption: Optional[float] = None
+    spot: Optional[float] = None
+    reserved_1yr: Optional[float] = None
+    reserved_3yr: Optional[float] = None
+    location: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the plain dict shape for JSON serialization."""
+        return asdict(self)
+
+
+async def _fetch_all(
+    client: "httpx.AsyncClient",
+    semaphore: asyncio.Semaphore,
+    params: Dict[str, str]
+) -> Tuple[List[Dict[str, Any]], bool]:
     """
-    Query Azure Retail Prices API for a specific VM SKU.
-    Fetches all price types: Consumption, Reservation, Spot
+    Fetch every page of a single filtered query, following NextPageLink.
+    
+    Returns (records, complete); complete is False when a page failed and
+    the records stop at the pages fetched before it.
     """
-    base_url = "https://prices.azure.com/api/retail/prices"
-    all_items = []
+    items = []
+    url = PRICES_API_URL
     
-    # Build filter - get all prices for this SKU
-    filter_str = f"serviceName eq 'Virtual Machines' and armSkuName eq '{sku}'"
+    while url:
+        try:
+            async with semaphore:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+            data = _json_loads(response.content)
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers a malformed page (orjson/json decode errors)
+            print(f"Error querying API: {e}", file=sys.stderr)
+            return items, False
+        
+        items.extend(data.get("Items", []))
+        
+        # NextPageLink already carries the filter and paging parameters
+        url = data.get("NextPageLink")
+        params = None
     
-    url = f"{base_url}?$filter={filter_str}&currencyCode={currency}"
+    return items, True
+
+
+def _is_reported(item: Dict[str, Any]) -> bool:
+    """Whether organize_prices uses this record (Windows spot/reservations are not)."""
+    return (
+        item.get("type", "") not in (SPOT_TYPE, RESERVATION_TYPE)
+        or "Windows" not in item.get("productName", "")
+    )
+
+
+def _stream_page(response: "requests.Response", items: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Incrementally parse one page, appending only reported records.
+    
+    Returns the page's NextPageLink. The full page is never materialized;
+    a single ijson event stream builds each record as soon as it is complete
+    and picks up NextPageLink on the way.
+    """
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    builder = None
+    next_link = None
+    
+    def consume_events() -> None:
+        nonlocal builder, next_link
+        for prefix, event, value in events:
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "Items.item" and event == "end_map":
+                    if _is_reported(builder.value):
+                        items.append(builder.value)
+                    builder = None
+            elif prefix == "Items.item" and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif prefix == "NextPageLink":
+                next_link = value
+        del events[:]
+    
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        parser.send(chunk)
+        consume_events()
+    
+    parser.close()
+    consume_events()
+    
+    return next_link
+
+
+def _fetch_all_sync(params: Dict[str, str]) -> Tuple[List[Dict[str, Any]], bool]:
+    """Blocking equivalent of _fetch_all, used when httpx is not installed."""
+    items = []
+    url = PRICES_API_URL
     
     while url:
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            items = data.get("Items", [])
-            all_items.extend(items)
-            
-            url = data.get("NextPageLink")
-            
-        except requests.exceptions.RequestException as e:
+            if ijson is not None:
+                with _SESSION.get(url, params=params, timeout=30, stream=True) as response:
+                    response.raise_for_status()
+                    url = _stream_page(response, items)
+            else:
+                response = _SESSION.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                data = _json_loads(response.content)
+                items.extend(data.get("Items", []))
+                url = data.get("NextPageLink")
+        except _FETCH_ERRORS as e:
             print(f"Error querying API: {e}", file=sys.stderr)
-            break
+            return items, False
+        
+        params = None
     
-    # Filter by regions if specified
+    return items, True
+
+
+async def query_azure_prices(
+    sku: str,
+    currency: str = "USD",
+    regions: Optional[List[str]] = None,
+    client: Optional["httpx.AsyncClient"] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Query Azure Retail Prices API for a specific VM SKU.
+    Fetches all price types: Consumption, Reservation, Spot
+    
+    When regions are given, one query per region is issued concurrently
+    so pagination of each region runs in parallel. Pass a shared client
+    to reuse its connections across several queries.
+    
+    Returns (records, complete); complete is False if any page failed, in
+    which case the records are partial and must not be cached.
+    """
+    # Build filter - get all prices for this SKU, except Dev/Test meters
+    # which are never reported and would skew the consumption minimum
+    filter_str = (
+        f"serviceName eq 'Virtual Machines' and armSkuName eq '{sku}' "
+        "and priceType ne 'DevTestConsumption'"
+    )
+    
+    # Region filtering is done server-side, one query per region
     if regions:
-        regions_lower = [r.lower() for r in regions]
-        all_items = [i for i in all_items if i.get("armRegionName", "").lower() in regions_lower]
+        filters = [f"{filter_str} and armRegionName eq '{r.lower()}'" for r in regions]
+    else:
+        filters = [filter_str]
+    
+    params = [{"$filter": f, "currencyCode": currency} for f in filters]
+    
+    if httpx is None:
+        # Fallback path: blocking session calls, one worker thread per query
+        pages = await asyncio.gather(*[
+            asyncio.to_thread(_fetch_all_sync, p) for p in params
+        ])
+    elif client is None:
+        async with httpx.AsyncClient(timeout=30) as client:
+            return await query_azure_prices(sku, currency, regions, client)
+    else:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        pages = await asyncio.gather(*[
+            _fetch_all(client, semaphore, p) for p in params
+        ])
+    
+    items = [item for page, _ in pages for item in page]
+    return items, all(complete for _, complete in pages)
+
+
+async def query_skus(
+    skus: List[str],
+    currency: str = "USD",
+    regions: Optional[List[str]] = None,
+    use_cache: bool = True
+) -> List[List[Dict[str, Any]]]:
+    """
+    Query several VM SKUs concurrently over one shared connection pool.
     
-    return all_items
+    SKUs with a fresh on-disk cache entry are served from it; the rest are
+    fetched together and cached unless a page of their query failed. Results are returned in the order of skus.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    pending = []
+    
+    for sku in skus:
+        cache_path = _cache_path(sku, currency, regions)
+        items = load_cached_prices(cache_path) if use_cache else None
+        if items is None:
+            print(f"Querying Azure pricing for {sku}...", file=sys.stderr)
+            pending.append((sku, cache_path))
+        else:
+            print(f"Using cached Azure pricing for {sku}", file=sys.stderr)
+            results[sku] = items
+    
+    if pending:
+        if httpx is None:
+            fetched = await asyncio.gather(*[
+                query_azure_prices(sku, currency, regions) for sku, _ in pending
+            ])
+        else:
+            async with httpx.AsyncClient(timeout=30) as client:
+                fetched = await asyncio.gather(*[
+                    query_azure_prices(sku, currency, regions, client)
+                    for sku, _ in pending
+                ])
+        
+        for (sku, cache_path), (items, complete) in zip(pending, fetched):
+            # Partial results are still reported, but only cached when every
+            # page of the query was fetched
+            if items and complete:
+                store_cached_prices(cache_path, items)
+            results[sku] = items
+    
+    return [results[sku] for sku in skus]
 
 
-def is_windows_price(item: Dict[str, Any]) -> bool:
-    """Check if this is a Windows pricing (has Windows in product name)."""
-    product_name = item.get("productName", "").lower()
-    return "windows" in product_name
+def _cache_path(sku: str, currency: str, regions: Optional[List[str]]) -> Path:
+    """Cache file for a (sku, currency, regions) query."""
+    key = repr((sku, currency.upper(), tuple(sorted(r.lower() for r in regions or []))))
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    suffix = ".json.zst" if zstandard else ".json"
+    return CACHE_DIR / f"{digest}{suffix}"
 
 
-def is_spot_price(item: Dict[str, Any]) -> bool:
-    """Check if this is a Spot pricing."""
-    return item.get("type", "").lower() == "spot"
+def load_cached_prices(path: Path) -> Optional[List[Dict[str, Any]]]:
+    """Return cached price records, or None if missing, expired or unreadable."""
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL_SECONDS:
+            return None
+        data = path.read_bytes()
+        if zstandard:
+            data = zstandard.decompress(data)
+        return _json_loads(data)
+    except Exception:
+        # A missing or corrupt cache entry is just a cache miss
+        return None
 
 
-def is_reservation_price(item: Dict[str, Any]) -> bool:
-    """Check if this is a Reservation pricing."""
-    return item.get("type", "").lower() == "reservation"
+def store_cached_prices(path: Path, items: List[Dict[str, Any]]) -> None:
+    """Write price records to the cache, ignoring filesystem errors."""
+    data = _json_dumps(items)
+    if zstandard:
+        data = zstandard.compress(data, CACHE_COMPRESSION_LEVEL)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+    except OSError as e:
+        print(f"Could not write pricing cache: {e}", file=sys.stderr)
 
 
-def get_reservation_term(item: Dict[str, Any]) -> Optional[str]:
-    """Get reservation term (1 Year or 3 Years)."""
-    return item.get("reservationTerm")
+def _reduce_prices_py(
+    region_id: List[int], price: List[float], kind: List[int], n_regions: int
+) -> List[List[float]]:
+    """Pure-Python equivalent of the Numba kernel, used when numba is missing."""
+    out = [[float("inf")] * N_PRICE_SLOTS for _ in range(n_regions)]
+    for r, p, k in zip(region_id, price, kind):
+        if k < 0:
+            continue
+        row = out[r]
+        if p < row[k]:
+            row[k] = p
+    return out
 
 
-def organize_prices(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Optional[float]]]:
+if njit is not None:
+    # Explicit signature: compiled eagerly at import and cached on disk
+    @njit("float64[:,:](int32[:], float64[:], int8[:], int64)", cache=True)
+    def _reduce_prices(region_id, price, kind, n_regions):
+        """Min-reduce prices into a (n_regions, N_PRICE_SLOTS) array; inf means no price."""
+        out = np.full((n_regions, N_PRICE_SLOTS), np.inf)
+        for i in range(region_id.shape[0]):
+            k = kind[i]
+            if k < 0:
+                continue
+            r = region_id[i]
+            if price[i] < out[r, k]:
+                out[r, k] = price[i]
+        return out
+else:
+    _reduce_prices = None
+
+
+def organize_prices(items: List[Dict[str, Any]]) -> Dict[str, RegionPrices]:
     """
     Organize prices by region with all price types.
     
     Returns:
         {
-            "eastus": {
-                "linux_consumption": 2.304,
-                "windows_consumption": 3.120,
-                "spot": 0.461,
-                "reserved_1yr": 1.456,
-                "reserved_3yr": 0.982
-            },
+            "eastus": RegionPrices(
+                linux_consumption=2.304,
+                windows_consumption=3.120,
+                spot=0.461,
+                reserved_1yr=1.456,
+                reserved_3yr=0.982,
+                location="US East",
+            ),
             ...
         }
     """
-    regions = defaultdict(lambda: {
-        "linux_consumption": None,
-        "windows_consumption": None,
-        "spot": None,
-        "reserved_1yr": None,
-        "reserved_3yr": None,
-        "location": None
-    })
+    intern = sys.intern
+    region_index: Dict[str, int] = {}
+    locations: List[str] = []
+    region_ids: List[int] = []
+    prices: List[float] = []
+    kinds: List[int] = []
     
     for item in items:
         region = item.get("armRegionName")
         if not region:
             continue
         
-        price = item.get("retailPrice", 0)
-        regions[region]["location"] = item.get("location", region)
+        # Interned names collapse the per-record copies and let the
+        # region_index lookup succeed on an identity check
+        region = intern(region)
+        rid = region_index.get(region)
+        if rid is None:
+            rid = region_index[region] = len(locations)
+            locations.append(region)
+        locations[rid] = intern(item.get("location") or region)
         
-        is_windows = is_windows_price(item)
-        is_spot = is_spot_price(item)
-        is_reservation = is_reservation_price(item)
+        # The API returns these fields with fixed casing, so no lowering needed
+        price_type = item.get("type", "")
+        is_windows = "Windows" in item.get("productName", "")
         
-        if is_spot:
+        if price_type == SPOT_TYPE:
             # Spot pricing (usually Linux-based)
-            if not is_windows and (regions[region]["spot"] is None or price < regions[region]["spot"]):
-                regions[region]["spot"] = price
-        elif is_reservation:
-            term = get_reservation_term(item)
+            kind = DROP if is_windows else SPOT
+        elif price_type == RESERVATION_TYPE:
             # Only use Linux reservations (Windows reservations are separate)
-            if not is_windows:
-                if term == "1 Year" and (regions[region]["reserved_1yr"] is None or price < regions[region]["reserved_1yr"]):
-                    regions[region]["reserved_1yr"] = price
-                elif term == "3 Years" and (regions[region]["reserved_3yr"] is None or price < regions[region]["reserved_3yr"]):
-                    regions[region]["reserved_3yr"] = price
-        else:
-            # Consumption pricing
+            term = item.get("reservationTerm")
             if is_windows:
-                if regions[region]["windows_consumption"] is None or price < regions[region]["windows_consumption"]:
-                    regions[region]["windows_consumption"] = price
+                kind = DROP
+            elif term == "1 Year":
+                kind = RESERVED_1YR
+            elif term == "3 Years":
+                kind = RESERVED_3YR
             else:
-                if regions[region]["linux_consumption"] is None or price < regions[region]["linux_consumption"]:
-                    regions[region]["linux_consumption"] = price
-    
-    return dict(regions)
+                kind = DROP
+        else:
+            # Consumption pricing
+            kind = WINDOWS_CONSUMPTION if is_windows else LINUX_CONSUMPTION
+        
+        region_ids.append(rid)
+        prices.append(item.get("retailPrice", 0))
+        kinds.append(kind)
+    
+    if _reduce_prices is not None:
+        reduced = _reduce_prices(
+            np.array(region_ids, dtype=np.int32),
+            np.array(prices, dtype=np.float64),
+            np.array(kinds, dtype=np.int8),
+            len(locations),
+        ).tolist()
+    else:
+        reduced = _reduce_prices_py(region_ids, prices, kinds, len(locations))
+    
+    # Convert the per-region rows to RegionPrices, inf meaning not offered
+    inf = float("inf")
+    return {
+        region: RegionPrices(
+            *[None if p == inf else p for p in reduced[rid]],
+            location=locations[rid],
+        )
+        for region, rid in region_index.items()
+    }
 
 
 def format_price(price: Optional[float], currency: str = "$") -> str:
@@ -155,39 +497,51 @@ def format_annual(price: Optional[float], currency: str = "$") -> str:
     return f"{currency}{annual:,.0f}"
 
 
-def print_summary_table(regions: Dict[str, Dict], sku: str, currency_symbol: str = "$"):
+def print_summary_table(regions: Dict[str, RegionPrices], sku: str, currency_symbol: str = "$"):
     """Print the summary table sorted by Linux price."""
     
-    # Filter out regions with no Linux price and sort
-    valid_regions = [(r, p) for r, p in regions.items() if p["linux_consumption"] is not None]
-    sorted_regions = sorted(valid_regions, key=lambda x: x[1]["linux_consumption"])
+    # Filter out regions with no Linux price and sort on the leading price
+    # (ties break on region name) so no Python key function is called
+    sorted_regions = [
+        (p.linux_consumption, r, p)
+        for r, p in regions.items() if p.linux_consumption is not None
+    ]
+    sorted_regions.sort()
     
     if not sorted_regions:
         print("No pricing data found for this SKU.")
         return None, None
     
-    print(f"\n## Azure VM Pricing: {sku}")
-    print(f"\n**All Regions** (sorted by Linux hourly price, ascending)\n")
+    # Collect output and emit it with a single write
+    lines = [
+        f"\n## Azure VM Pricing: {sku}",
+        "\n**All Regions** (sorted by Linux hourly price, ascending)\n",
+    ]
     
     # Header
-    print("| Region | Linux (Win+AHB)/hr | Windows/hr | Spot/hr | 1yr Reserved | 3yr Reserved |")
-    print("|--------|-------------------|------------|---------|--------------|--------------|")
-    
-    for region, prices in sorted_regions:
-        linux = format_price(prices["linux_consumption"], currency_symbol)
-        windows = format_price(prices["windows_consumption"], currency_symbol)
-        spot = format_price(prices["spot"], currency_symbol)
-        res_1yr = format_price(prices["reserved_1yr"], currency_symbol)
-        res_3yr = format_price(prices["reserved_3yr"], currency_symbol)
-        
-        print(f"| {region} | {linux} | {windows} | {spot} | {res_1yr} | {res_3yr} |")
-    
-    print("\n> *Linux and Windows with Azure Hybrid Benefit (AHB) share the same compute price*")
-    print("> *Spot prices vary based on demand and VMs can be evicted with 30s notice*")
+    lines.append("| Region | Linux (Win+AHB)/hr | Windows/hr | Spot/hr | 1yr Reserved | 3yr Reserved |")
+    lines.append("|--------|-------------------|------------|---------|--------------|--------------|")
+    
+    for _, region, prices in sorted_regions:
+        cells = " | ".join(
+            "N/A" if p is None else f"{currency_symbol}{p:.4f}"
+            for p in (
+                prices.linux_consumption,
+                prices.windows_consumption,
+                prices.spot,
+                prices.reserved_1yr,
+                prices.reserved_3yr,
+            )
+        )
+        lines.append(f"| {region} | {cells} |")
+    
+    lines.append("\n> *Linux and Windows with Azure Hybrid Benefit (AHB) share the same compute price*")
+    lines.append("> *Spot prices vary based on demand and VMs can be evicted with 30s notice*")
+    sys.stdout.write("\n".join(lines) + "\n")
     
     # Return cheapest and most expensive
-    cheapest = sorted_regions[0]
-    most_expensive = sorted_regions[-1]
+    cheapest = sorted_regions[0][1:]
+    most_expensive = sorted_regions[-1][1:]
     
     return cheapest, most_expensive
 
@@ -198,13 +552,16 @@ def print_cost_analysis(cheapest: tuple, most_expensive: tuple, currency_symbol:
     cheapest_region, cheapest_prices = cheapest
     expensive_region, expensive_prices = most_expensive
     
-    print(f"\n---\n")
-    print(f"## Cost Analysis ({HOURS_PER_YEAR:,} hours/year)\n")
+    # Collect output and emit it with a single write
+    lines = [
+        "\n---\n",
+        f"## Cost Analysis ({HOURS_PER_YEAR:,} hours/year)\n",
+    ]
     
     # Cheapest region table
-    print(f"### Cheapest Region: {cheapest_region}\n")
-    print("| Price Type | Hourly | Annual |")
-    print("|------------|--------|--------|")
+    lines.append(f"### Cheapest Region: {cheapest_region}\n")
+    lines.append("| Price Type | Hourly | Annual |")
+    lines.append("|------------|--------|--------|")
     
     price_types = [
         ("Linux (Win+AHB)", "linux_consumption"),
@@ -215,28 +572,28 @@ def print_cost_analysis(cheapest: tuple, most_expensive: tuple, currency_symbol:
     ]
     
     for label, key in price_types:
-        hourly = format_price(cheapest_prices[key], currency_symbol)
-        annual = format_annual(cheapest_prices[key], currency_symbol)
-        print(f"| {label} | {hourly} | {annual} |")
+        hourly = format_price(getattr(cheapest_prices, key), currency_symbol)
+        annual = format_annual(getattr(cheapest_prices, key), currency_symbol)
+        lines.append(f"| {label} | {hourly} | {annual} |")
     
     # Most expensive region table
-    print(f"\n### Most Expensive Region: {expensive_region}\n")
-    print("| Price Type | Hourly | Annual |")
-    print("|------------|--------|--------|")
+    lines.append(f"\n### Most Expensive Region: {expensive_region}\n")
+    lines.append("| Price Type | Hourly | Annual |")
+    lines.append("|------------|--------|--------|")
     
     for label, key in price_types:
-        hourly = format_price(expensive_prices[key], currency_symbol)
-        annual = format_annual(expensive_prices[key], currency_symbol)
-        print(f"| {label} | {hourly} | {annual} |")
+        hourly = format_price(getattr(expensive_prices, key), currency_symbol)
+        annual = format_annual(getattr(expensive_prices, key), currency_symbol)
+        lines.append(f"| {label} | {hourly} | {annual} |")
     
     # Savings table
-    print(f"\n### Annual Savings (Cheapest vs Most Expensive)\n")
-    print("| Price Type | Cheapest Annual | Expensive Annual | Savings | % Saved |")
-    print("|------------|-----------------|------------------|---------|---------|")
+    lines.append("\n### Annual Savings (Cheapest vs Most Expensive)\n")
+    lines.append("| Price Type | Cheapest Annual | Expensive Annual | Savings | % Saved |")
+    lines.append("|------------|-----------------|------------------|---------|---------|")
     
     for label, key in price_types:
-        cheap_price = cheapest_prices[key]
-        exp_price = expensive_prices[key]
+        cheap_price = getattr(cheapest_prices, key)
+        exp_price = getattr(expensive_prices, key)
         
         if cheap_price is not None and exp_price is not None:
             cheap_annual = cheap_price * HOURS_PER_YEAR
@@ -244,9 +601,11 @@ def print_cost_analysis(cheapest: tuple, most_expensive: tuple, currency_symbol:
             savings = exp_annual - cheap_annual
             pct = (savings / exp_annual) * 100 if exp_annual > 0 else 0
             
-            print(f"| {label} | {currency_symbol}{cheap_annual:,.0f} | {currency_symbol}{exp_annual:,.0f} | {currency_symbol}{savings:,.0f} | {pct:.1f}% |")
+            lines.append(f"| {label} | {currency_symbol}{cheap_annual:,.0f} | {currency_symbol}{exp_annual:,.0f} | {currency_symbol}{savings:,.0f} | {pct:.1f}% |")
         else:
-            print(f"| {label} | N/A | N/A | N/A | N/A |")
+            lines.append(f"| {label} | N/A | N/A | N/A | N/A |")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -257,7 +616,7 @@ def main():
     parser.add_argument(
         "--sku", "-s",
         required=True,
-        help="VM SKU name (e.g., Standard_D48as_v6)"
+        help="VM SKU name, or comma-separated list of SKUs to compare (e.g., Standard_D48as_v6)"
     )
     parser.add_argument(
         "--currency", "-c",
@@ -268,13 +627,22 @@ def main():
         "--regions", "-r",
         help="Comma-separated list of regions to filter (optional)"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Bypass the {CACHE_TTL_SECONDS // 3600}h on-disk cache of API responses"
+    )
     
     args = parser.parse_args()
     
-    # Normalize SKU name
-    sku = args.sku
-    if not sku.startswith("Standard_"):
-        sku = f"Standard_{sku}"
+    # Normalize SKU names (duplicates are only queried once)
+    skus = []
+    for sku in args.sku.split(","):
+        sku = sku.strip()
+        if sku and not sku.startswith("Standard_"):
+            sku = f"Standard_{sku}"
+        if sku and sku not in skus:
+            skus.append(sku)
     
     # Parse regions if provided
     regions = None
@@ -295,25 +663,32 @@ def main():
     }
     currency_symbol = currency_symbols.get(args.currency.upper(), "$")
     
-    # Query API
-    print(f"Querying Azure pricing for {sku}...", file=sys.stderr)
-    items = query_azure_prices(sku, args.currency, regions)
-    
-    if not items:
-        print(f"No pricing data found for SKU: {sku}", file=sys.stderr)
-        sys.exit(1)
-    
-    print(f"Found {len(items)} price records", file=sys.stderr)
-    
-    # Organize by region
-    organized = organize_prices(items)
+    # Query all SKUs concurrently, serving fresh ones from the cache
+    all_items = asyncio.run(
+        query_skus(skus, args.currency, regions, use_cache=not args.no_cache)
+    )
     
-    # Print summary table
-    result = print_summary_table(organized, sku, currency_symbol)
+    found_any = False
+    for sku, items in zip(skus, all_items):
+        if not items:
+            print(f"No pricing data found for SKU: {sku}", file=sys.stderr)
+            continue
+        found_any = True
+        
+        print(f"Found {len(items)} price records for {sku}", file=sys.stderr)
+        
+        # Organize by region
+        organized = organize_prices(items)
+        
+        # Print summary table
+        result = print_summary_table(organized, sku, currency_symbol)
+        
+        if result[0] is not None:
+            # Print cost analysis
+            print_cost_analysis(result[0], result[1], currency_symbol)
     
-    if result[0] is not None:
-        # Print cost analysis
-        print_cost_analysis(result[0], result[1], currency_symbol)
+    if not found_any:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+Aggregation kernels for latency samples.
+
+Reduces a regions x rounds matrix of handshake times (int64 nanoseconds,
+-1 for a failed probe) to per-region (valid, lowest, highest, total) arrays.
+Rows with no valid probe report 0 for all four, whichever backend runs.
+Uses a Numba kernel when numba is installed, NumPy reductions otherwise;
+`aggregate` is None when NumPy itself is missing.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional; callers fall back to a pure-Python pass
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; the NumPy reductions below are used instead
+    njit = None
+
+
+def _aggregate_numpy(samples):
+    """Masked NumPy reductions along the rounds axis."""
+    ok = samples >= 0
+    valid = ok.sum(axis=1)
+    lowest = np.where(ok, samples, np.iinfo(np.int64).max).min(axis=1)
+    lowest[valid == 0] = 0
+    highest = np.where(ok, samples, 0).max(axis=1)
+    totals = np.where(ok, samples, 0).sum(axis=1)
+    return valid, lowest, highest, totals
+
+
+if njit is not None:
+    # Explicit signature: compiled once at import, then loaded from the
+    # on-disk cache on later server starts
+    @njit("UniTuple(int64[:], 4)(int64[:, :])", cache=True)
+    def _aggregate_numba(samples):
+        """One pass over every sample; rows with no valid probe keep zeros."""
+        n_regions, n_rounds = samples.shape
+        valid = np.zeros(n_regions, dtype=np.int64)
+        lowest = np.zeros(n_regions, dtype=np.int64)
+        highest = np.zeros(n_regions, dtype=np.int64)
+        totals = np.zeros(n_regions, dtype=np.int64)
+        for i in range(n_regions):
+            for j in range(n_rounds):
+                lat = samples[i, j]
+                if lat < 0:
+                    continue
+                if valid[i] == 0 or lat < lowest[i]:
+                    lowest[i] = lat
+                if lat > highest[i]:
+                    highest[i] = lat
+                totals[i] += lat
+                valid[i] += 1
+        return valid, lowest, highest, totals
+
+    aggregate = _aggregate_numba
+elif np is not None:
+    aggregate = _aggregate_numpy
+else:
+    aggregate = None
@@ -0,0 +1,98 @@
+"""
+Token-caching credential wrappers.
+
+azure-identity's CLI and developer-tool credentials acquire a new token on
+every get_token() call (for AzureCliCredential, an `az` subprocess). These
+wrappers keep the last token per scope and only go back to the wrapped
+credential when it is about to expire.
+"""
+
+import time
+import asyncio
+import threading
+from typing import Any, Optional
+
+from azure.core.credentials import AccessToken
+
+# Token scope for Azure Resource Manager
+ARM_SCOPE = "https://management.azure.com/.default"
+
+# Refresh a cached token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+
+def _cache_key(scopes: tuple[str, ...], kwargs: dict) -> Optional[tuple]:
+    """Cache key for a token request, or None if it must not be cached."""
+    # Claims challenges (e.g. CAE) always need a fresh token
+    if kwargs.get("claims"):
+        return None
+    return scopes, kwargs.get("tenant_id")
+
+
+def _is_fresh(token: Optional[AccessToken]) -> bool:
+    """Whether a cached token is usable for at least TOKEN_REFRESH_MARGIN seconds."""
+    return token is not None and token.expires_on - time.time() > TOKEN_REFRESH_MARGIN
+
+
+class CachedTokenCredential:
+    """Thread-safe TokenCredential that reuses tokens until near expiry."""
+
+    def __init__(self, credential: Any):
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        """Return a cached token for the scopes, refreshing it when near expiry."""
+        key = _cache_key(scopes, kwargs)
+        if key is None:
+            return self._credential.get_token(*scopes, **kwargs)
+
+        with self._lock:
+            token = self._tokens.get(key)
+            if not _is_fresh(token):
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+
+    def close(self) -> None:
+        """Close the wrapped credential."""
+        self._credential.close()
+
+    def __enter__(self) -> "CachedTokenCredential":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncCachedTokenCredential:
+    """AsyncTokenCredential that reuses tokens until near expiry."""
+
+    def __init__(self, credential: Any):
+        self._credential = credential
+        self._tokens: dict[tuple, AccessToken] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        """Return a cached token for the scopes, refreshing it when near expiry."""
+        key = _cache_key(scopes, kwargs)
+        if key is None:
+            return await self._credential.get_token(*scopes, **kwargs)
+
+        async with self._lock:
+            token = self._tokens.get(key)
+            if not _is_fresh(token):
+                token = await self._credential.get_token(*scopes, **kwargs)
+                self._tokens[key] = token
+            return token
+
+    async def close(self) -> None:
+        """Close the wrapped credential."""
+        await self._credential.close()
+
+    async def __aenter__(self) -> "AsyncCachedTokenCredential":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
@@ -5,18 +5,26 @@ Tests latency to Azure regions by pinging blob storage endpoints.
 Creates temporary storage accounts for regions without existing endpoints.
 """
 
+import os
 import socket
 import time
-import uuid
+import binascii
+import queue
 import logging
 import asyncio
+import functools
 import threading
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional, Callable, Any
+from urllib.parse import urlparse
 from collections.abc import Sequence
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AioDefaultAzureCredential
 from azure.mgmt.resource import ResourceManagementClient
 from azure.mgmt.storage import StorageManagementClient
 from azure.mgmt.storage.models import (
@@ -25,13 +33,60 @@ from azure.mgmt.storage.models import (
     Kind,
 )
 from azure.mgmt.subscription import SubscriptionClient
+from azure.mgmt.subscription.aio import SubscriptionClient as AioSubscriptionClient
+from azure.core.credentials import TokenCredential
+from azure.core.credentials_async import AsyncTokenCredential
 from azure.core.exceptions import AzureError
+from azure.core.polling import LROPoller
+from azure.core.pipeline.transport import AioHttpTransport, RequestsTransport
 
 from .models import (
     LatencyResult,
     CreatedStorageAccount,
     SubscriptionInfo,
 )
+from ._kernels import aggregate, np
+from .credentials import CachedTokenCredential
+from .regions import load_blob_endpoints
+
+
+# TCP probe settings: blob endpoints are probed on their HTTPS port
+PROBE_PORT = 443
+PROBE_TYPE = socket.SOCK_STREAM
+
+# Seconds a resolved endpoint address is reused before DNS is queried again;
+# the server is long-lived and endpoint IPs do change
+DNS_CACHE_TTL = 300
+
+# Most hostnames kept in the DNS cache (oldest answers are dropped first)
+DNS_CACHE_SIZE = 1024
+
+# Seconds to wait for a single TCP handshake. A handshake that times out is
+# retried once with the shorter budget before the probe counts as failed.
+PROBE_TIMEOUT = 2.0
+PROBE_RETRY_TIMEOUT = 1.0
+
+# Seconds to wait for all storage account deletions in Phase 4
+CLEANUP_TIMEOUT = 300
+
+# Minimum time between the starts of two probes to the same endpoint (seconds)
+PROBE_INTERVAL = 0.1
+
+# How often Phase 3 checks the cancellation token on event loops that cannot
+# watch its self-pipe (the Windows proactor loop has no add_reader)
+CANCEL_POLL_INTERVAL = 0.05
+
+# Most TCP handshakes kept in flight at once by a probe batch
+MAX_PROBES_IN_FLIGHT = 256
+
+# Default log location: one file per run in LOG_DIR, of which only the newest
+# LOG_FILES_KEPT are kept, so a long-lived server does not fill the directory
+LOG_DIR = "./azure-latency-logs"
+LOG_FILES_KEPT = 20
+
+# Pooled connections per host on the shared ARM session; covers the widest
+# Phase 2/4 fan-out so concurrent calls never discard connections
+HTTP_POOL_SIZE = 64
 
 
 # Type alias for progress callback
@@ -39,23 +94,203 @@ from .models import (
 ProgressCallback = Callable[[int, int, str, float], Any]
 
 
+# Process-wide credential, shared by every tester and subscription listing.
+# The wrapper reuses the last token until it nears expiry, so runs after the
+# first skip token acquisition (an `az` subprocess with the CLI credential).
+_credential: Optional[CachedTokenCredential] = None
+_credential_lock = threading.Lock()
+
+
+def get_shared_credential() -> CachedTokenCredential:
+    """Return the shared token-caching DefaultAzureCredential, creating it on first use."""
+    global _credential
+    with _credential_lock:
+        if _credential is None:
+            _credential = CachedTokenCredential(DefaultAzureCredential())
+        return _credential
+
+
+@functools.lru_cache(maxsize=1)
+def _get_http_session() -> requests.Session:
+    """Return the HTTP session shared by every sync management client."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+def _shared_transport() -> RequestsTransport:
+    """Transport over the shared session, so all clients reuse its TLS connections."""
+    return RequestsTransport(session=_get_http_session(), session_owner=False)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_subscription_client(credential: TokenCredential) -> SubscriptionClient:
+    """Return the shared subscription client for a credential."""
+    return SubscriptionClient(credential, transport=_shared_transport())
+
+
+@functools.lru_cache(maxsize=16)
+def _get_clients(
+    subscription_id: str, credential: TokenCredential
+) -> tuple[ResourceManagementClient, StorageManagementClient]:
+    """Return cached (resource client, storage client) for a subscription and credential."""
+    return (
+        ResourceManagementClient(credential, subscription_id, transport=_shared_transport()),
+        StorageManagementClient(credential, subscription_id, transport=_shared_transport()),
+    )
+
+
+def _default_log_file(run_id: str) -> str:
+    """Return a new log path in LOG_DIR, first pruning older default logs."""
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        with os.scandir(LOG_DIR) as entries:
+            logs = [
+                (entry.stat().st_mtime, entry.path)
+                for entry in entries
+                if entry.name.startswith("azure-latency-test-") and entry.name.endswith(".log")
+            ]
+        logs.sort()
+        for _, path in logs[: max(0, len(logs) - (LOG_FILES_KEPT - 1))]:
+            os.remove(path)
+    except OSError:
+        pass  # Best effort; an unusable directory surfaces when the log opens
+    return os.path.join(LOG_DIR, f"azure-latency-test-{run_id}.log")
+
+
+def _blob_endpoint(region: str) -> str:
+    """Public blob endpoint hostname named after a region."""
+    return f"{region}.blob.core.windows.net"
+
+
+# hostname -> (time.monotonic() of the lookup, addresses), oldest first
+_dns_cache: dict[str, tuple[float, tuple[str, ...]]] = {}
+_dns_cache_lock = threading.Lock()
+
+
+def _cached_resolve(hostname: str) -> tuple[str, ...]:
+    """
+    Resolve a hostname to its IP addresses, IPv4 first.
+
+    Successful lookups are reused for DNS_CACHE_TTL seconds; failures
+    raise socket.gaierror and are not cached.
+    """
+    entry = _dns_cache.get(hostname)
+    if entry is not None and time.monotonic() - entry[0] < DNS_CACHE_TTL:
+        return entry[1]
+
+    addrinfo = socket.getaddrinfo(
+        hostname, PROBE_PORT, socket.AF_UNSPEC, PROBE_TYPE, 0, socket.AI_NUMERICSERV
+    )
+    addrinfo.sort(key=lambda info: info[0] != socket.AF_INET)
+    addresses = tuple(dict.fromkeys(info[4][0] for info in addrinfo))
+
+    with _dns_cache_lock:
+        # Re-insert so the dict stays ordered by lookup time
+        _dns_cache.pop(hostname, None)
+        _dns_cache[hostname] = (time.monotonic(), addresses)
+        if len(_dns_cache) > DNS_CACHE_SIZE:
+            del _dns_cache[next(iter(_dns_cache))]
+    return addresses
+
+
+def _avg_ms_key(result: LatencyResult) -> float:
+    """Sort key for results: average latency, with untested regions (None) last."""
+    avg_ms = result.avg_ms
+    return float("inf") if avg_ms is None else avg_ms
+
+
+async def _probe_once(
+    loop: asyncio.AbstractEventLoop, family: int, address: tuple[str, int]
+) -> tuple[int, bool]:
+    """Time one TCP handshake; returns (ns or -1 on failure, whether it was retried)."""
+    # Raw non-blocking sockets driven by the loop's selector: no
+    # transport/stream setup sits between the SYN-ACK and the timer
+    retried = False
+    for timeout in (PROBE_TIMEOUT, PROBE_RETRY_TIMEOUT):
+        sock = socket.socket(family, PROBE_TYPE)
+        sock.setblocking(False)
+        try:
+            start = time.perf_counter_ns()
+            await asyncio.wait_for(loop.sock_connect(sock, address), timeout=timeout)
+            return time.perf_counter_ns() - start, retried
+
+        except asyncio.TimeoutError:
+            # Checked before OSError: on 3.11+ it is a subclass of it
+            retried = True
+        except OSError:
+            break
+        finally:
+            sock.close()
+
+    return -1, retried
+
+
+async def _ping_batch(
+    targets: Sequence[tuple[int, tuple[str, int]]],
+) -> list[tuple[int, bool]]:
+    """
+    Time one TCP handshake to every (family, address) target on the running
+    loop, at most MAX_PROBES_IN_FLIGHT at once.
+
+    Returns one (ns or -1 on failure, retried) pair per target, in order.
+    """
+    loop = asyncio.get_running_loop()
+    if len(targets) <= MAX_PROBES_IN_FLIGHT:
+        return await asyncio.gather(
+            *[_probe_once(loop, family, address) for family, address in targets]
+        )
+
+    semaphore = asyncio.Semaphore(MAX_PROBES_IN_FLIGHT)
+
+    async def ping(family: int, address: tuple[str, int]) -> tuple[int, bool]:
+        async with semaphore:
+            return await _probe_once(loop, family, address)
+
+    return await asyncio.gather(*[ping(family, address) for family, address in targets])
+
+
 class CancellationToken:
     """Thread-safe cancellation token for graceful shutdown."""
     
     def __init__(self):
         self._cancelled = threading.Event()
+        # Self-pipe: cancel() makes the read end readable so an event loop
+        # can wake up on cancellation instead of polling between probes
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
     
     def cancel(self):
         """Signal cancellation."""
         self._cancelled.set()
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass  # Buffer full or closed: the pipe is already readable
     
     def is_cancelled(self) -> bool:
         """Check if cancellation has been requested."""
         return self._cancelled.is_set()
     
+    def fileno(self) -> int:
+        """File descriptor that becomes readable once cancel() is called."""
+        return self._wakeup_r.fileno()
+    
     def reset(self):
         """Reset the cancellation state."""
         self._cancelled.clear()
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except OSError:
+            pass  # Drained
+
+    def close(self):
+        """Release the self-pipe; is_cancelled() keeps working afterwards."""
+        self._wakeup_r.close()
+        self._wakeup_w.close()
 
 
 class AzureLatencyTester:
@@ -66,65 +301,114 @@ class AzureLatencyTester:
         request_count: int = 10,
         throttle_limit: int = 10,
         resource_group_prefix: str = "latency-test-mcp",
-        log_file: str = "./azure-latency-test.log",
+        log_file: Optional[str] = None,
         regions: Sequence[str] | None = None,
         subscription_id: Optional[str] = None,
         progress_callback: Optional[ProgressCallback] = None,
         cancellation_token: Optional[CancellationToken] = None,
+        credential: Optional[TokenCredential] = None,
     ):
         self.request_count = request_count
         self.throttle_limit = throttle_limit
         self.resource_group_prefix = resource_group_prefix
-        self.log_file = log_file
         self.regions = list(regions) if regions else []
         self.target_subscription_id = subscription_id
         self.progress_callback = progress_callback
+        # A token created here is closed when run() finishes
+        self._owns_token = cancellation_token is None
         self.cancellation_token = cancellation_token or CancellationToken()
 
-        # Generate unique resource group name with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        self.resource_group_name = f"{self.resource_group_prefix}-{timestamp}"
-
-        # Thread-safe data structures
-        self.endpoint_map: dict[str, str] = {}
+        # Unique per run: hex epoch seconds plus a random suffix, so tests
+        # started in the same second never share a resource group (one run's
+        # cleanup deletes the group) or a default log file
+        timestamp = format(time.time_ns() // 1_000_000_000, "x")
+        run_id = f"{timestamp}-{binascii.hexlify(os.urandom(3)).decode()}"
+        self.resource_group_name = f"{self.resource_group_prefix}-{run_id}"
+        self.log_file = log_file or _default_log_file(run_id)
+
+        # Shared state. Workers return their results and only the calling
+        # thread merges them, under _state_lock.
+        self._state_lock = threading.Lock()
+        # region -> (blob hostname, resolved IP or None if not yet resolved)
+        self.endpoint_map: dict[str, tuple[str, Optional[str]]] = {}
         self.created_accounts: list[CreatedStorageAccount] = []
         self.deleted_accounts: list[str] = []
         self.failed_deletions: list[dict] = []
         self.results: list[LatencyResult] = []
+        self.best: Optional[LatencyResult] = None
         self.warnings: list[str] = []
 
-        # Azure clients (initialized on connect)
-        self.credential: Optional[DefaultAzureCredential] = None
+        # Azure clients (initialized on connect); the shared credential is
+        # used unless the caller supplies one
+        self.credential: Optional[TokenCredential] = credential
         self.subscription_id: Optional[str] = None
         self.resource_client: Optional[ResourceManagementClient] = None
         self.storage_client: Optional[StorageManagementClient] = None
 
+        # Worker threads shared by Phases 1-3 (created on first use)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
         # Setup logging
         self._setup_logging()
 
+        # region -> blob hostname checked and probed instead of the default
+        self.blob_endpoints = self._load_blob_endpoints()
+
     def _setup_logging(self) -> None:
-        """Configure logging to file."""
+        """Configure logging to file through a background queue listener."""
         self.logger = logging.getLogger(f"AzureLatencyTest-{id(self)}")
         self.logger.setLevel(logging.DEBUG)
         
         # Remove existing handlers to avoid duplicates
         self.logger.handlers.clear()
+        self._log_listener: Optional[QueueListener] = None
 
-        # File handler
+        # File handler. Opened eagerly so a bad path surfaces as a warning now
         try:
             file_handler = logging.FileHandler(self.log_file, mode="w")
             file_handler.setLevel(logging.DEBUG)
             file_format = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
             file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
         except (IOError, OSError) as e:
             # If we can't write to log file, use a null handler
             self.logger.addHandler(logging.NullHandler())
             self.warnings.append(f"Could not create log file: {e}")
+        else:
+            # Callers only enqueue records; the listener thread does the writes
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            self.logger.addHandler(QueueHandler(log_queue))
+            self._log_listener = QueueListener(log_queue, file_handler)
+            self._log_listener.start()
 
         self.logger.info("Azure Latency Test Started")
         self.logger.info(f"Resource group name: {self.resource_group_name}")
 
+    def _load_blob_endpoints(self) -> dict[str, str]:
+        """Configured blob endpoint overrides, if any."""
+        try:
+            return load_blob_endpoints()
+        except (OSError, ValueError) as e:
+            self.warnings.append(f"Ignoring blob endpoint overrides: {e}")
+            return {}
+
+    def _stop_logging(self) -> None:
+        """Flush queued log records to the file and close it."""
+        listener, self._log_listener = self._log_listener, None
+        if listener is None:
+            return
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool reused across phases; shut down at the end of run()."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.throttle_limit, thread_name_prefix="latency-test"
+            )
+        return self._executor
+
     def _report_progress(self, phase: int, total_phases: int, message: str, percentage: float) -> None:
         """Report progress via callback if available."""
         self.logger.info(f"Progress: Phase {phase}/{total_phases} - {message} ({percentage:.0f}%)")
@@ -145,10 +429,9 @@ class AzureLatencyTester:
         """Connect to Azure using DefaultAzureCredential."""
         self.logger.info("Connecting to Azure...")
         try:
-            self.credential = DefaultAzureCredential()
-
             # Get subscriptions
-            sub_client = SubscriptionClient(self.credential)
+            self.credential = self.credential or get_shared_credential()
+            sub_client = _get_subscription_client(self.credential)
             subscriptions = list(sub_client.subscriptions.list())
 
             if not subscriptions:
@@ -172,12 +455,9 @@ class AzureLatencyTester:
 
             self.logger.info(f"Connected to Azure subscription: {sub_name} ({self.subscription_id})")
 
-            # Initialize management clients
-            self.resource_client = ResourceManagementClient(
-                self.credential, self.subscription_id
-            )
-            self.storage_client = StorageManagementClient(
-                self.credential, self.subscription_id
+            # Reuse management clients (and their connection pools) across runs
+            self.resource_client, self.storage_client = _get_clients(
+                self.subscription_id, self.credential
             )
 
             return True
@@ -186,38 +466,65 @@ class AzureLatencyTester:
             self.logger.error(f"Failed to connect to Azure: {e}")
             raise
 
-    def _check_dns(self, region: str) -> tuple[str, Optional[str]]:
-        """Check if DNS resolves for a region's blob endpoint."""
-        endpoint = f"{region}.blob.core.windows.net"
+    async def _check_dns_async(
+        self, region: str, semaphore: asyncio.Semaphore
+    ) -> tuple[str, Optional[str], Optional[str]]:
+        """Check if DNS resolves for a region's blob endpoint; returns (region, endpoint, ip)."""
+        endpoint = self.blob_endpoints.get(region) or _blob_endpoint(region)
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            try:
+                addresses = await loop.run_in_executor(self.executor, _cached_resolve, endpoint)
+                return region, endpoint, addresses[0]
+            except socket.gaierror:
+                return region, None, None
+
+    @classmethod
+    async def prefetch_dns(
+        cls, regions: Sequence[str], executor: Optional[ThreadPoolExecutor] = None
+    ) -> None:
+        """Warm the DNS cache for the regions' blob endpoints ahead of run()."""
         try:
-            socket.gethostbyname(endpoint)
-            return region, endpoint
-        except socket.gaierror:
-            return region, None
+            overrides = load_blob_endpoints()
+        except (OSError, ValueError):
+            overrides = {}  # run() reports unreadable overrides
+        endpoints = dict.fromkeys(overrides.get(region) or _blob_endpoint(region) for region in regions)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[loop.run_in_executor(executor, _cached_resolve, endpoint) for endpoint in endpoints],
+            return_exceptions=True,
+        )
+
+    async def _check_all_dns(
+        self, regions: list[str]
+    ) -> list[tuple[str, Optional[str], Optional[str]]]:
+        """Resolve every region's blob endpoint concurrently."""
+        semaphore = asyncio.Semaphore(self.throttle_limit)
+        return await asyncio.gather(
+            *[self._check_dns_async(region, semaphore) for region in regions]
+        )
 
     def phase1_check_dns(self) -> tuple[list[str], list[str]]:
         """Phase 1: Check DNS resolution for all regions."""
-        self._report_progress(1, 4, f"Checking DNS resolution for {len(self.regions)} regions", 10)
+        # Drop duplicates (keeping order) so each endpoint is resolved once
+        regions = list(dict.fromkeys(self.regions))
+        self._report_progress(1, 4, f"Checking DNS resolution for {len(regions)} regions", 10)
         
-        if self._check_cancelled():
+        if not regions or self._check_cancelled():
             return [], []
 
         self.logger.info("Phase 1: Checking DNS resolution for all regions")
 
         regions_needing_storage: list[str] = []
 
-        with ThreadPoolExecutor(max_workers=self.throttle_limit) as executor:
-            futures = {
-                executor.submit(self._check_dns, region): region
-                for region in self.regions
-            }
-
-            for future in as_completed(futures):
-                if self._check_cancelled():
-                    break
-                region, endpoint = future.result()
+        # Every endpoint is resolved (through the DNS cache), including the
+        # static map's: a mapped hostname that no longer resolves must still
+        # get a temporary storage account rather than fail every probe
+        checked = asyncio.run(self._check_all_dns(regions))
+        with self._state_lock:
+            for region, endpoint, ip in checked:
                 if endpoint:
-                    self.endpoint_map[region] = endpoint
+                    self.endpoint_map[region] = (endpoint, ip)
                 else:
                     regions_needing_storage.append(region)
 
@@ -229,15 +536,21 @@ class AzureLatencyTester:
 
         return resolved, to_create
 
-    def _create_storage_account(self, region: str) -> Optional[CreatedStorageAccount]:
-        """Create a temporary storage account in a region."""
-        if self._check_cancelled():
-            return None
+    def _begin_create_storage_account(
+        self, region: str
+    ) -> tuple[str, str, Optional[LROPoller], Optional[str]]:
+        """Start creating a temporary storage account in a region.
 
+        Returns (region, account name, poller, warning); the poller is None
+        if the request was rejected or cancellation was requested.
+        """
         # Generate unique storage account name (3-24 chars, lowercase alphanumeric only)
-        guid = uuid.uuid4().hex[:16]
+        guid = binascii.hexlify(os.urandom(8)).decode()
         storage_account_name = f"lat{guid}"
 
+        if self._check_cancelled():
+            return region, storage_account_name, None, None
+
         try:
             # Create storage account
             params = StorageAccountCreateParameters(
@@ -251,10 +564,32 @@ class AzureLatencyTester:
             poller = self.storage_client.storage_accounts.begin_create(
                 self.resource_group_name, storage_account_name, params
             )
-            poller.result()  # Wait for completion
+            return region, storage_account_name, poller, None
+
+        except AzureError as e:
+            self.logger.error(f"Failed to create storage account in {region}: {e}")
+            return region, storage_account_name, None, f"Failed to create storage account in {region}: {str(e)}"
 
-            endpoint = f"{storage_account_name}.blob.core.windows.net"
-            self.endpoint_map[region] = endpoint
+    def _finish_create_storage_account(
+        self, region: str, storage_account_name: str, poller: LROPoller
+    ) -> tuple[Optional[CreatedStorageAccount], Optional[str], Optional[str]]:
+        """Wait for a storage account creation to complete.
+
+        Returns (account, resolved IP, warning) without touching shared state.
+        """
+        try:
+            created = poller.result()  # Wait for completion
+
+            blob_url = created.primary_endpoints.blob if created.primary_endpoints else None
+            endpoint = urlparse(blob_url).hostname if blob_url else None
+            endpoint = endpoint or f"{storage_account_name}.blob.core.windows.net"
+
+            # DNS for a new account may not have propagated yet; Phase 3
+            # resolves it again if this lookup fails
+            try:
+                ip = _cached_resolve(endpoint)[0]
+            except socket.gaierror:
+                ip = None
 
             account = CreatedStorageAccount(
                 region=region,
@@ -262,14 +597,12 @@ class AzureLatencyTester:
                 endpoint=endpoint,
                 status="Created",
             )
-            self.created_accounts.append(account)
             self.logger.info(f"Created storage account: {storage_account_name} in {region}")
-            return account
+            return account, ip, None
 
         except AzureError as e:
             self.logger.error(f"Failed to create storage account in {region}: {e}")
-            self.warnings.append(f"Failed to create storage account in {region}: {str(e)}")
-            return None
+            return None, None, f"Failed to create storage account in {region}: {str(e)}"
 
     def phase2_create_storage_accounts(self, regions_to_create: list[str]) -> None:
         """Phase 2: Create temporary storage accounts for unresolved regions."""
@@ -283,78 +616,246 @@ class AzureLatencyTester:
         self._report_progress(2, 4, f"Creating storage accounts for {len(regions_to_create)} regions", 20)
         self.logger.info("Phase 2: Creating temporary storage accounts")
 
-        # Ensure resource group exists
+        # Ensure resource group exists. The name is freshly timestamped, so a
+        # prior get() would always 404; create_or_update is idempotent anyway.
         rg_location = regions_to_create[0]
+        self.logger.info(f"Creating resource group '{self.resource_group_name}' in '{rg_location}'")
         try:
-            self.resource_client.resource_groups.get(self.resource_group_name)
-            self.logger.info(f"Resource group '{self.resource_group_name}' already exists")
-        except AzureError:
-            self.logger.info(f"Creating resource group '{self.resource_group_name}' in '{rg_location}'")
-            try:
-                self.resource_client.resource_groups.create_or_update(
-                    self.resource_group_name, {"location": rg_location}
-                )
-                self.logger.info(f"Resource group created: {self.resource_group_name}")
-            except AzureError as e:
-                self.logger.error(f"Failed to create resource group: {e}")
-                raise RuntimeError(f"Failed to create resource group: {e}")
+            self.resource_client.resource_groups.create_or_update(
+                self.resource_group_name, {"location": rg_location}
+            )
+            self.logger.info(f"Resource group created: {self.resource_group_name}")
+        except AzureError as e:
+            self.logger.error(f"Failed to create resource group: {e}")
+            raise RuntimeError(f"Failed to create resource group: {e}")
 
         if self._check_cancelled():
             return
 
-        # Create storage accounts in parallel
-        with ThreadPoolExecutor(max_workers=self.throttle_limit) as executor:
-            futures = {
-                executor.submit(self._create_storage_account, region): region
-                for region in regions_to_create
-            }
-
-            for future in as_completed(futures):
-                if self._check_cancelled():
-                    break
-                future.result()  # Process results (logging happens in worker)
+        # Issue every create request first. The SDK polls each long-running
+        # operation on its own thread, so waiting on the pollers in turn
+        # overlaps all creations: wall time is the slowest one, not the sum.
+        started = list(self.executor.map(self._begin_create_storage_account, regions_to_create))
+
+        # Wait on every poller even after cancellation: an account that
+        # finished creating must still be recorded so Phase 4 deletes it
+        for region, storage_account_name, poller, warning in started:
+            account = ip = None
+            if poller is not None:
+                account, ip, warning = self._finish_create_storage_account(
+                    region, storage_account_name, poller
+                )
+            with self._state_lock:
+                if account:
+                    self.created_accounts.append(account)
+                    self.endpoint_map[account.region] = (account.endpoint, ip)
+                if warning:
+                    self.warnings.append(warning)
 
         self._report_progress(2, 4, f"Created {len(self.created_accounts)} storage accounts", 30)
         self.logger.info(f"Storage account creation complete. Created: {len(self.created_accounts)}")
 
-    def _test_latency(self, region: str, endpoint: str) -> LatencyResult:
-        """Test TCP latency to an endpoint."""
-        latencies: list[float] = []
+    async def _resolve_probe_ip(self, endpoint: str, ip: Optional[str]) -> Optional[str]:
+        """Return the endpoint's IP, resolving it now if Phases 1-2 did not."""
+        if ip is not None:
+            return ip
+        loop = asyncio.get_running_loop()
+        try:
+            return (await loop.run_in_executor(self.executor, _cached_resolve, endpoint))[0]
+        except socket.gaierror as e:
+            self.logger.error(f"Failed to resolve {endpoint}: {e}")
+            return None
 
-        for i in range(self.request_count):
-            if self._check_cancelled():
-                break
+    @staticmethod
+    def _summarize(region: str, endpoint: str, latencies: list[int], retries: int) -> LatencyResult:
+        """Build a region's result from its probe latencies in ns (failed probes are -1)."""
+        # Calculate statistics in a single integer pass; convert to ms once
+        failed = 0
+        valid = 0
+        total = 0
+        lowest = 0
+        highest = 0
+        for lat in latencies:
+            if lat < 0:
+                failed += 1
+                continue
+            valid += 1
+            total += lat
+            if valid == 1 or lat < lowest:
+                lowest = lat
+            if lat > highest:
+                highest = lat
+
+        return LatencyResult(
+            region=region,
+            endpoint=endpoint,
+            min_ms=round(lowest / 1_000_000, 1) if valid else None,
+            max_ms=round(highest / 1_000_000, 1) if valid else None,
+            avg_ms=round(total / valid / 1_000_000, 1) if valid else None,
+            failed=failed,
+            retries=retries,
+        )
 
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(10)
+    def _summarize_all(
+        self, latencies: dict[str, list[int]], retries: dict[str, int]
+    ) -> list[LatencyResult]:
+        """Summarize every region in one kernel call when NumPy (or Numba) is available."""
+        regions = [region for region, lats in latencies.items() if lats]
+        if not regions:
+            return []
 
-                start = time.perf_counter()
-                sock.connect((endpoint, 443))
-                elapsed = (time.perf_counter() - start) * 1000  # Convert to ms
+        rounds = {len(latencies[region]) for region in regions}
+        if aggregate is None or len(rounds) != 1:
+            return [
+                self._summarize(region, self.endpoint_map[region][0], latencies[region], retries[region])
+                for region in regions
+            ]
+
+        # regions x rounds matrix of ns samples; failed probes are -1
+        samples = np.array([latencies[region] for region in regions], dtype=np.int64)
+        valid_counts, lowest_ns, highest_ns, totals = aggregate(samples)
+        valid = valid_counts.tolist()
+        lowest = (lowest_ns / 1_000_000).tolist()
+        highest = (highest_ns / 1_000_000).tolist()
+        avg = (totals / np.maximum(valid_counts, 1) / 1_000_000).tolist()
+        probes = samples.shape[1]
+
+        return [
+            LatencyResult(
+                region=region,
+                endpoint=self.endpoint_map[region][0],
+                min_ms=round(lowest[i], 1) if valid[i] else None,
+                max_ms=round(highest[i], 1) if valid[i] else None,
+                avg_ms=round(avg[i], 1) if valid[i] else None,
+                failed=probes - valid[i],
+                retries=retries[region],
+            )
+            for i, region in enumerate(regions)
+        ]
 
-                sock.close()
-                latencies.append(elapsed)
+    async def _probe_rounds(
+        self,
+        targets: dict[str, tuple[int, tuple[str, int]]],
+        latencies: dict[str, list[int]],
+        retries: dict[str, int],
+    ) -> None:
+        """
+        Run request_count rounds of one probe per region, filling latencies
+        and retries in place.
+
+        Rounds start at least PROBE_INTERVAL apart, so each endpoint is paced
+        without sleeping between its own probes. Each round is one batch of
+        concurrent handshakes on the event loop.
+        """
+        # Bind hot-loop lookups to locals once
+        sleep = asyncio.sleep
+        perf_counter = time.perf_counter
+        is_cancelled = self._check_cancelled
+        regions = list(targets)
+        batch = list(targets.values())
+        total_rounds = self.request_count
+
+        for round_number in range(1, total_rounds + 1):
+            if is_cancelled():
+                return
+
+            round_start = perf_counter()
+            timings = await _ping_batch(batch)
+            for region, (elapsed, retried) in zip(regions, timings):
+                latencies[region].append(elapsed)
+                retries[region] += retried
+
+            # Report incremental progress (50-90%)
+            progress = 50 + (round_number / total_rounds) * 40
+            self._report_progress(3, 4, f"Completed probe round {round_number}/{total_rounds}", progress)
+
+            if round_number < total_rounds:
+                await sleep(max(0.0, PROBE_INTERVAL - (perf_counter() - round_start)))
+
+    def _watch_cancellation(
+        self, loop: asyncio.AbstractEventLoop, on_cancel: Callable[[], Any]
+    ) -> Callable[[], Any]:
+        """
+        Call on_cancel as soon as the token is cancelled; returns a function
+        that stops watching.
+
+        Selector loops wake on the token's self-pipe. Loops without
+        add_reader (the Windows proactor loop) poll the token instead.
+        """
+        token = self.cancellation_token
+        wakeup_fd = token.fileno()
+
+        def on_wakeup() -> None:
+            loop.remove_reader(wakeup_fd)
+            on_cancel()
 
-            except (socket.error, socket.timeout):
-                latencies.append(-1)
+        try:
+            loop.add_reader(wakeup_fd, on_wakeup)
+        except NotImplementedError:
+            async def poll() -> None:
+                while not token.is_cancelled():
+                    await asyncio.sleep(CANCEL_POLL_INTERVAL)
+                on_cancel()
 
-            time.sleep(0.1)  # 100ms delay between requests
+            return loop.create_task(poll()).cancel
 
-        # Calculate statistics
-        valid = [lat for lat in latencies if lat >= 0]
-        failed = len([lat for lat in latencies if lat < 0])
+        return lambda: loop.remove_reader(wakeup_fd)
 
-        result = LatencyResult(
-            region=region,
-            endpoint=endpoint,
-            min_ms=round(min(valid), 1) if valid else None,
-            max_ms=round(max(valid), 1) if valid else None,
-            avg_ms=round(sum(valid) / len(valid), 1) if valid else None,
-            failed=failed,
+    async def _run_latency_tests(self) -> list[LatencyResult]:
+        """Probe every endpoint in interleaved rounds and summarize per region."""
+        results: list[LatencyResult] = []
+        regions = list(self.endpoint_map.items())
+
+        # Probes connect to the IP so they time only the TCP handshake
+        ips = await asyncio.gather(
+            *[self._resolve_probe_ip(endpoint, ip) for _, (endpoint, ip) in regions]
         )
+        targets: dict[str, tuple[int, tuple[str, int]]] = {}
+        for (region, (endpoint, _)), ip in zip(regions, ips):
+            if ip is None:
+                results.append(
+                    LatencyResult(region=region, endpoint=endpoint, failed=self.request_count)
+                )
+            else:
+                family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+                targets[region] = (family, (ip, PROBE_PORT))
+
+        latencies: dict[str, list[int]] = {region: [] for region in targets}
+        retries: dict[str, int] = dict.fromkeys(targets, 0)
 
-        return result
+        # Abort in-flight handshakes as soon as the token is cancelled rather
+        # than waiting for their connect timeouts
+        loop = asyncio.get_running_loop()
+        rounds = asyncio.ensure_future(self._probe_rounds(targets, latencies, retries))
+        stop_watching = None
+        try:
+            stop_watching = self._watch_cancellation(loop, rounds.cancel)
+            await rounds
+        except asyncio.CancelledError:
+            if not self._check_cancelled():
+                raise
+        finally:
+            if stop_watching is not None:
+                stop_watching()
+            rounds.cancel()  # No-op once finished; stops it if watching failed
+
+        completed_rounds = min(map(len, latencies.values()), default=self.request_count)
+        if completed_rounds < self.request_count:
+            self.warnings.append(
+                f"Operation cancelled after {completed_rounds} of "
+                f"{self.request_count} probe rounds"
+            )
+
+        # Keep what finished probes measured; regions never probed are dropped
+        for result in self._summarize_all(latencies, retries):
+            results.append(result)
+            self.logger.info(
+                f"Result: {result.region} - Avg: {result.avg_ms}ms, "
+                f"Min: {result.min_ms}ms, Max: {result.max_ms}ms, "
+                f"Failed: {result.failed}"
+            )
+
+        return results
 
     def phase3_run_latency_tests(self) -> list[LatencyResult]:
         """Phase 3: Run latency tests against all endpoints."""
@@ -365,47 +866,17 @@ class AzureLatencyTester:
 
         self.logger.info("Phase 3: Starting latency tests")
 
-        for region, endpoint in self.endpoint_map.items():
-            self.logger.info(f"Testing: {region} -> {endpoint}")
+        for region, (endpoint, ip) in self.endpoint_map.items():
+            self.logger.info(f"Testing: {region} -> {endpoint} ({ip or 'unresolved'})")
 
-        results: list[LatencyResult] = []
-        total_regions = len(self.endpoint_map)
-        completed = 0
-
-        with ThreadPoolExecutor(max_workers=self.throttle_limit) as executor:
-            futures: dict[Future, str] = {
-                executor.submit(self._test_latency, region, endpoint): region
-                for region, endpoint in self.endpoint_map.items()
-            }
-
-            for future in as_completed(futures):
-                if self._check_cancelled():
-                    # Cancel remaining futures
-                    for f in futures:
-                        f.cancel()
-                    self.warnings.append(
-                        f"Operation cancelled after {completed} of {total_regions} regions tested"
-                    )
-                    break
-
-                result = future.result()
-                results.append(result)
-                completed += 1
-                
-                # Report incremental progress (50-90%)
-                progress = 50 + (completed / total_regions) * 40
-                self._report_progress(3, 4, f"Tested {completed}/{total_regions} regions", progress)
-                
-                self.logger.info(
-                    f"Result: {result.region} - Avg: {result.avg_ms}ms, "
-                    f"Min: {result.min_ms}ms, Max: {result.max_ms}ms, "
-                    f"Failed: {result.failed}"
-                )
+        results = asyncio.run(self._run_latency_tests())
 
-        # Sort by average latency (N/A goes to end)
-        self.results = sorted(
-            results, key=lambda r: r.avg_ms if r.avg_ms is not None else float("inf")
-        )
+        # Sort by average latency (N/A goes to end); the response lists every
+        # region, so the full order is needed, not just the minimum
+        ordered = sorted(results, key=_avg_ms_key)
+        with self._state_lock:
+            self.results = ordered
+            self.best = ordered[0] if ordered and ordered[0].avg_ms is not None else None
 
         self.logger.info("Phase 3 Complete: Latency test results")
         return self.results
@@ -431,14 +902,21 @@ class AzureLatencyTester:
         self._report_progress(4, 4, f"Cleaning up {len(self.created_accounts)} storage accounts", 95)
         self.logger.info("Phase 4: Cleaning up temporary storage accounts")
 
-        # Always attempt cleanup, even if cancelled
-        with ThreadPoolExecutor(max_workers=self.throttle_limit) as executor:
-            futures = {
-                executor.submit(self._delete_storage_account, account): account
-                for account in self.created_accounts
-            }
-
-            for future in as_completed(futures):
+        # Always attempt cleanup, even if cancelled. Storage account deletion
+        # has no long-running-operation API, so all deletes are issued at once
+        # and collected with an overall deadline instead of throttle_limit slots.
+        # A dedicated pool, so stuck deletes never hold up the shared one.
+        executor = ThreadPoolExecutor(max_workers=len(self.created_accounts))
+        futures = {
+            executor.submit(self._delete_storage_account, account): account
+            for account in self.created_accounts
+        }
+
+        done, not_done = wait(futures, timeout=CLEANUP_TIMEOUT)
+        executor.shutdown(wait=False)
+
+        with self._state_lock:
+            for future in done:
                 account_name, region, status = future.result()
                 if status == "Deleted":
                     self.deleted_accounts.append(account_name)
@@ -449,6 +927,17 @@ class AzureLatencyTester:
                         "error": status,
                     })
 
+            for future in not_done:
+                account = futures[future]
+                self.logger.error(
+                    f"Timed out deleting {account.storage_account} after {CLEANUP_TIMEOUT}s"
+                )
+                self.failed_deletions.append({
+                    "account": account.storage_account,
+                    "region": account.region,
+                    "error": f"FAILED: timed out after {CLEANUP_TIMEOUT}s",
+                })
+
         self.logger.info(
             f"Cleanup complete. Deleted: {len(self.deleted_accounts)}, "
             f"Failed: {len(self.failed_deletions)}"
@@ -479,61 +968,94 @@ class AzureLatencyTester:
 
     def run(self) -> list[LatencyResult]:
         """Execute the full latency test workflow."""
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        # Connect to Azure
-        self.connect_to_azure()
+        try:
+            # Connect to Azure
+            self.connect_to_azure()
 
-        # Phase 1: Check DNS
-        _, regions_to_create = self.phase1_check_dns()
+            # Phase 1: Check DNS
+            _, regions_to_create = self.phase1_check_dns()
 
-        if self._check_cancelled():
-            self.phase4_cleanup()
-            return self.results
+            if self._check_cancelled():
+                self.phase4_cleanup()
+                return self.results
 
-        # Phase 2: Create storage accounts
-        self.phase2_create_storage_accounts(regions_to_create)
+            try:
+                # Phase 2: Create storage accounts
+                self.phase2_create_storage_accounts(regions_to_create)
 
-        if self._check_cancelled():
-            self.phase4_cleanup()
-            return self.results
+                # Phase 3: Run latency tests
+                if not self._check_cancelled():
+                    self.phase3_run_latency_tests()
+            finally:
+                # Phase 4: Cleanup (always run, even if cancelled or
+                # Phase 3 failed, so created accounts are not leaked)
+                self.phase4_cleanup()
 
-        # Phase 3: Run latency tests
-        self.phase3_run_latency_tests()
+            self.logger.info("Azure Latency Test Completed")
+            self.logger.info(f"Total duration: {time.perf_counter() - start_time:.2f} seconds")
 
-        # Phase 4: Cleanup (always run, even if cancelled)
-        self.phase4_cleanup()
+            return self.results
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+            if self._owns_token:
+                self.cancellation_token.close()
+            self._stop_logging()
+
+
+def _to_subscription_info(s: Any) -> SubscriptionInfo:
+    """Convert an SDK Subscription model to a SubscriptionInfo."""
+    # Handle state - could be enum, string, or None
+    if s.state is None:
+        state = "Unknown"
+    elif isinstance(s.state, str):
+        state = s.state
+    else:
+        # It's an enum, get the value
+        state = s.state.value if hasattr(s.state, 'value') else str(s.state)
+
+    return SubscriptionInfo(
+        id=s.subscription_id,
+        name=s.display_name,
+        state=state,
+    )
+
+
+def list_azure_subscriptions(
+    credential: Optional[TokenCredential] = None,
+) -> list[SubscriptionInfo]:
+    """List all available Azure subscriptions (with the shared credential by default)."""
+    try:
+        sub_client = _get_subscription_client(credential or get_shared_credential())
+        return [_to_subscription_info(s) for s in sub_client.subscriptions.list()]
+    except Exception as e:
+        raise RuntimeError(f"Failed to list Azure subscriptions: {e}")
 
-        self.logger.info("Azure Latency Test Completed")
-        self.logger.info(f"Total duration: {time.time() - start_time:.2f} seconds")
 
-        return self.results
+async def list_azure_subscriptions_async(
+    credential: Optional[AsyncTokenCredential] = None,
+    session: Any = None,
+) -> list[SubscriptionInfo]:
+    """
+    List all available Azure subscriptions with the async SDK clients.
 
+    Pass a long-lived async credential to reuse its cached token, and a shared
+    aiohttp ClientSession to reuse its pooled TLS connections. Without a
+    credential, a temporary one is created and closed.
+    """
+    own_credential = credential is None
+    if own_credential:
+        credential = AioDefaultAzureCredential()
 
-def list_azure_subscriptions() -> list[SubscriptionInfo]:
-    """List all available Azure subscriptions."""
+    transport = AioHttpTransport(session=session, session_owner=False) if session else None
     try:
-        credential = DefaultAzureCredential()
-        sub_client = SubscriptionClient(credential)
-        subscriptions = list(sub_client.subscriptions.list())
-
-        result = []
-        for s in subscriptions:
-            # Handle state - could be enum, string, or None
-            if s.state is None:
-                state = "Unknown"
-            elif isinstance(s.state, str):
-                state = s.state
-            else:
-                # It's an enum, get the value
-                state = s.state.value if hasattr(s.state, 'value') else str(s.state)
-            
-            result.append(SubscriptionInfo(
-                id=s.subscription_id,
-                name=s.display_name,
-                state=state,
-            ))
-        
-        return result
+        async with AioSubscriptionClient(credential, transport=transport) as sub_client:
+            return [_to_subscription_info(s) async for s in sub_client.subscriptions.list()]
     except Exception as e:
-        raise RuntimeError(f"Failed to list Azure subscriptions: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Failed to list Azure subscriptions: {e}")
+    finally:
+        if own_credential:
+            await credential.close()
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Azure region endpoint configuration.
+
+Regions are probed through `{region}.blob.core.windows.net` unless an
+override file names a different blob hostname for them.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+# Optional JSON object of {"region": "blob hostname or URL"}; entries replace
+# the default endpoint for a region. Read from a fixed per-user location, or
+# from the file named by BLOB_ENDPOINTS_ENV, never from a caller-chosen path.
+BLOB_ENDPOINTS_FILE = Path.home() / ".config" / "azure-latency-mcp" / "blob-endpoints.json"
+BLOB_ENDPOINTS_ENV = "AZURE_LATENCY_BLOB_ENDPOINTS"
+
+def load_blob_endpoints(path: Optional[str] = None) -> dict[str, str]:
+    """
+    Return the region -> blob hostname overrides from an override file.
+
+    The file is path if given, else the one named by BLOB_ENDPOINTS_ENV, else
+    BLOB_ENDPOINTS_FILE; a missing BLOB_ENDPOINTS_FILE means no overrides.
+    Raises OSError or ValueError when the file cannot be read or is not a
+    JSON object of strings.
+    """
+    endpoints: dict[str, str] = {}
+    explicit = path or os.environ.get(BLOB_ENDPOINTS_ENV)
+    path = explicit or BLOB_ENDPOINTS_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        if explicit:
+            raise  # An explicitly named file must exist
+        return endpoints
+
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    for region, endpoint in overrides.items():
+        if not isinstance(endpoint, str) or not endpoint.strip():
+            raise ValueError(f"{path}: endpoint for '{region}' must be a non-empty string")
+        endpoint = endpoint.strip()
+        endpoints[region.lower().strip()] = urlparse(endpoint).hostname or endpoint
+    return endpoints
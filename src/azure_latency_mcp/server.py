@@ -4,25 +4,41 @@ Azure Latency MCP Server.
 Provides tools for testing Azure region latency and listing subscriptions.
 """
 
+import os
 import asyncio
 import json
 import time
+import logging
+import itertools
 import threading
-from typing import Optional
+import weakref
+from typing import Any, Optional
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+import aiohttp
+from azure.identity.aio import DefaultAzureCredential as AioDefaultAzureCredential
 from mcp.server.fastmcp import FastMCP, Context
 from pydantic import Field
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; responses are then encoded with the stdlib json
+    orjson = None
+
 from .models import (
+    TEST_LATENCY_VALIDATOR,
     TestLatencyInput,
     build_latency_response,
     build_subscriptions_response,
 )
+from .credentials import ARM_SCOPE, AsyncCachedTokenCredential
 from .latency_tester import (
     AzureLatencyTester,
     CancellationToken,
-    list_azure_subscriptions,
+    get_shared_credential,
+    list_azure_subscriptions_async,
 )
 
 
@@ -30,17 +46,142 @@ from .latency_tester import (
 # Server Configuration
 # =============================================================================
 
-# Queue lock for ensuring only one latency test runs at a time
-_test_lock = asyncio.Lock()
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int, minimum: int = 1) -> int:
+    """Read a positive integer setting, falling back to default when invalid."""
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        logger.warning(f"Ignoring {name}={raw!r}: expected an integer >= {minimum}; using {default}")
+        return default
+    return value
+
+
+# Latency tests allowed to run at once; further calls wait for a free slot.
+# Each test gets its own resource group and, by default, its own log file.
+MAX_CONCURRENT_TESTS = _env_int("AZURE_LATENCY_MAX_CONCURRENT_TESTS", 4)
+
+
+def _env_regions(name: str) -> list[str]:
+    """Read a comma-separated region list setting; empty when unset or invalid."""
+    raw = os.environ.get(name, "")
+    if not raw.strip():
+        return []
+    try:
+        return TestLatencyInput.normalize_regions(raw.split(","))
+    except ValueError as e:
+        logger.warning(f"Ignoring {name}={raw!r}: {e}")
+        return []
+
+
+# Regions whose blob endpoints are resolved at startup, so the first test's
+# Phase 1 finds them in the DNS cache
+PREFETCH_REGIONS = _env_regions("AZURE_LATENCY_PREFETCH_REGIONS")
+_test_slots = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
+
+# Track active cancellation tokens for cleanup; entries drop out on their own
+# once a token is no longer referenced
+_active_tokens: "weakref.WeakValueDictionary[str, CancellationToken]" = weakref.WeakValueDictionary()
+
+# Test ids; drawn on the event loop thread, so never handed out twice
+_test_counter = itertools.count()
+
+# Absolute paths of log files claimed by running or queued tests; a second
+# test may not open (and truncate) one of them
+_active_log_files: set[str] = set()
+
+# Seconds a subscription listing is reused before ARM is queried again
+SUBSCRIPTIONS_CACHE_TTL = 60
+
+# (time.monotonic() of the listing, built response) for the process credential
+_subs_cache: Optional[tuple[float, dict]] = None
+_subs_lock = asyncio.Lock()
+
+# Worker threads for blocking Azure SDK calls and tester runs. Deliberately
+# threads, not processes: the work is I/O-bound, and workers share the
+# process credential, the pooled TLS connections and the DNS cache, none of
+# which would survive in a child process.
+EXECUTOR_MAX_WORKERS = 64
+
+# Upper bound on regions probed concurrently by a single test
+MAX_THROTTLE_LIMIT = 32
+
+# Indent every tool response (AZURE_MCP_PRETTY=1); compact JSON otherwise
+PRETTY_JSON = os.environ.get("AZURE_MCP_PRETTY") == "1"
+
+
+async def _warm_token(credential: AsyncCachedTokenCredential) -> None:
+    """Acquire the ARM token in the background so the first tool call finds it cached."""
+    try:
+        await credential.get_token(ARM_SCOPE)
+    except Exception:
+        pass  # Not signed in yet; the tool call reports the error
+
 
-# Track active cancellation tokens for cleanup
-_active_tokens: dict[str, CancellationToken] = {}
+def _dump(obj: dict, pretty: bool = PRETTY_JSON) -> str:
+    """Serialize a tool response as compact JSON, or indented by two spaces if pretty."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, option=option).decode()
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
 
 
 @asynccontextmanager
 async def lifespan(server: FastMCP):
-    """Manage server lifecycle."""
-    yield {}
+    """
+    Manage server lifecycle: own the thread pool used by the tools, the
+    token-caching credentials, and the aiohttp session shared by async Azure
+    SDK clients, and warm the DNS cache for PREFETCH_REGIONS.
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="az-latency"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    credential = AsyncCachedTokenCredential(AioDefaultAzureCredential())
+    warm_up = asyncio.create_task(_warm_token(credential))
+    prefetch = asyncio.create_task(AzureLatencyTester.prefetch_dns(PREFETCH_REGIONS, executor))
+    session = aiohttp.ClientSession()
+    try:
+        yield {
+            "executor": executor,
+            "credential": credential,
+            "sync_credential": get_shared_credential(),
+            "session": session,
+        }
+    finally:
+        warm_up.cancel()
+        prefetch.cancel()
+        await session.close()
+        await credential.close()
+        executor.shutdown(wait=False)
+
+
+def _get_lifespan_resource(ctx: Optional[Context], name: str) -> Any:
+    """Return a lifespan-owned resource, or None outside a server request."""
+    if ctx is None:
+        return None
+    try:
+        return ctx.request_context.lifespan_context.get(name)
+    except (AttributeError, ValueError):
+        return None  # Called outside a request
+
+
+def _get_executor(ctx: Optional[Context]) -> Optional[ThreadPoolExecutor]:
+    """Return the lifespan-owned executor, or None for the loop default."""
+    executor = _get_lifespan_resource(ctx, "executor")
+    assert executor is None or isinstance(executor, ThreadPoolExecutor), (
+        "tool work shares in-process clients and must run on a thread pool"
+    )
+    return executor
 
 
 # Initialize MCP server
@@ -64,13 +205,25 @@ mcp = FastMCP(
         "openWorldHint": True,
     }
 )
-async def azure_list_subscriptions() -> str:
+async def azure_list_subscriptions(
+    refresh: bool = Field(
+        default=False,
+        description="Bypass the cached listing and query Azure again.",
+    ),
+    ctx: Context = None,
+) -> str:
     """List all available Azure subscriptions.
 
     Returns a list of Azure subscriptions accessible with the current credentials.
     Uses DefaultAzureCredential which supports Azure CLI, environment variables,
     managed identity, and other authentication methods.
 
+    Listings are cached for SUBSCRIPTIONS_CACHE_TTL seconds.
+
+    Args:
+        refresh: Ignore the cache and fetch a fresh listing.
+        ctx: MCP context (provides the server's credential and HTTP session).
+
     Returns:
         JSON object containing:
         - subscriptions: List of subscription objects with id, name, and state
@@ -83,16 +236,29 @@ async def azure_list_subscriptions() -> str:
         >>> result = await azure_list_subscriptions()
         >>> # Returns: {"subscriptions": [{"id": "xxx", "name": "My Sub", "state": "Enabled"}], "current": "xxx"}
     """
+    global _subs_cache
+
     try:
-        # Run in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        subscriptions = await loop.run_in_executor(None, list_azure_subscriptions)
+        async with _subs_lock:
+            if (
+                refresh
+                or _subs_cache is None
+                or time.monotonic() - _subs_cache[0] >= SUBSCRIPTIONS_CACHE_TTL
+            ):
+                subscriptions = await list_azure_subscriptions_async(
+                    credential=_get_lifespan_resource(ctx, "credential"),
+                    session=_get_lifespan_resource(ctx, "session"),
+                )
+
+                if not subscriptions:
+                    raise RuntimeError("No Azure subscriptions found. Please ensure you are logged in with 'az login'.")
 
-        if not subscriptions:
-            raise RuntimeError("No Azure subscriptions found. Please ensure you are logged in with 'az login'.")
+                # Cache the built response so hits skip the to_dict() pass too
+                _subs_cache = (time.monotonic(), build_subscriptions_response(subscriptions))
 
-        response = build_subscriptions_response(subscriptions)
-        return json.dumps(response, indent=2)
+            response = _subs_cache[1]
+
+        return _dump(response)
 
     except Exception as e:
         raise RuntimeError(f"Failed to list Azure subscriptions: {str(e)}")
@@ -125,7 +291,11 @@ async def azure_test_latency(
     ),
     log_file: Optional[str] = Field(
         default=None,
-        description="Path to log file. Defaults to './azure-latency-test.log' in current working directory.",
+        description="Path to log file. Defaults to a new file per test in './azure-latency-logs' (the newest 20 are kept).",
+    ),
+    pretty: bool = Field(
+        default=False,
+        description="Indent the JSON response for human reading. Compact JSON is returned by default.",
     ),
     ctx: Context = None,
 ) -> str:
@@ -144,7 +314,9 @@ async def azure_test_latency(
         request_count: Number of TCP connection attempts per region (3-20).
                        Default is 10. Higher values provide more accurate averages.
         subscription_id: Optional Azure subscription ID. Uses first available if not specified.
-        log_file: Optional path to log file. Defaults to './azure-latency-test.log'.
+        log_file: Optional path to log file. Defaults to a new file per test
+                  in './azure-latency-logs' (the newest 20 are kept).
+        pretty: Indent the JSON response. Default is False (compact JSON).
         ctx: MCP context for progress reporting.
 
     Returns:
@@ -157,6 +329,7 @@ async def azure_test_latency(
             - endpoint: Blob storage endpoint used
             - min_ms, max_ms, avg_ms: Latency statistics
             - failed: Number of failed connection attempts
+            - retries: Number of handshakes retried after timing out
         - regions_tested: Number of regions successfully tested
         - resource_group: Name of the temporary resource group used
         - subscription_id: Azure subscription ID used
@@ -176,80 +349,95 @@ async def azure_test_latency(
         ... )
         >>> # Returns results sorted by latency with best_region indicated
     """
-    # Validate input
-    if not regions:
-        raise ValueError("At least one region must be specified")
-
-    # Normalize regions
-    regions = [r.lower().strip() for r in regions if r.strip()]
-    if not regions:
-        raise ValueError("No valid regions provided after normalization")
+    # Validate and normalize all arguments once (regions deduplicated,
+    # malformed names rejected) with the validator built at import
+    params = TEST_LATENCY_VALIDATOR.validate_python({
+        "regions": regions,
+        "request_count": request_count,
+        "subscription_id": subscription_id,
+        "log_file": log_file,
+        "pretty": pretty,
+    })
+    regions = params.regions
+    request_count = params.request_count
+    subscription_id = params.subscription_id
+    log_file = params.log_file
+    pretty = params.pretty
+
+    # Without a log file the tester picks a name unique to the run. A named
+    # one is reserved before waiting for a slot, so a call that would clash
+    # with a running or queued test fails at once instead of queueing first.
+    log_path = os.path.abspath(log_file) if log_file else None
+    if log_path in _active_log_files:
+        raise ValueError(f"Log file '{log_file}' is in use by another latency test")
+    if log_path is not None:
+        _active_log_files.add(log_path)
 
-    # Use default log file if not specified
-    actual_log_file = log_file or "./azure-latency-test.log"
-
-    # Acquire lock to ensure only one test runs at a time
-    async with _test_lock:
-        start_time = time.time()
+    try:
+        # Wait for one of the MAX_CONCURRENT_TESTS slots
+        async with _test_slots:
+            start_time = time.perf_counter()
         
-        # Create cancellation token
-        cancel_token = CancellationToken()
-        test_id = str(time.time())
-        _active_tokens[test_id] = cancel_token
-
-        try:
-            # Progress callback that reports to MCP context
-            def progress_callback(phase: int, total_phases: int, message: str, percentage: float):
-                if ctx:
-                    try:
-                        # Use asyncio to report progress from sync context
-                        asyncio.get_event_loop().call_soon_threadsafe(
-                            lambda: None  # Progress reporting placeholder
-                        )
-                    except Exception:
-                        pass  # Ignore progress errors
-
-            # Create tester instance
-            tester = AzureLatencyTester(
-                request_count=request_count,
-                throttle_limit=10,
-                log_file=actual_log_file,
-                regions=regions,
-                subscription_id=subscription_id,
-                progress_callback=progress_callback,
-                cancellation_token=cancel_token,
-            )
-
-            # Run the test in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(None, tester.run)
-
-            # Build response
-            duration = time.time() - start_time
-
-            response = build_latency_response(
-                success=True,
-                results=results,
-                resource_group=tester.resource_group_name,
-                subscription_id=tester.subscription_id or "",
-                created_accounts=[a.storage_account for a in tester.created_accounts],
-                deleted_accounts=tester.deleted_accounts,
-                failed_deletions=tester.failed_deletions,
-                warnings=tester.warnings,
-                duration_seconds=duration,
-                log_file=actual_log_file,
-                cancelled=cancel_token.is_cancelled(),
-            )
-
-            return json.dumps(response, indent=2)
-
-        except Exception as e:
-            # Return error as MCP exception
-            raise RuntimeError(f"Latency test failed: {str(e)}")
-
-        finally:
-            # Clean up cancellation token
-            _active_tokens.pop(test_id, None)
+            # Create cancellation token
+            cancel_token = CancellationToken()
+            test_id = f"t{next(_test_counter)}"
+            _active_tokens[test_id] = cancel_token
+
+            try:
+                loop = asyncio.get_running_loop()
+
+                # Progress callback that reports to MCP context. The tester calls
+                # it from a worker thread, so the report is submitted to the
+                # server loop without waiting for it.
+                def progress_callback(phase: int, total_phases: int, message: str, percentage: float):
+                    asyncio.run_coroutine_threadsafe(ctx.report_progress(percentage, 100), loop)
+
+                # Create tester instance
+                tester = AzureLatencyTester(
+                    request_count=request_count,
+                    throttle_limit=min(MAX_THROTTLE_LIMIT, len(regions)),
+                    log_file=log_file,
+                    regions=regions,
+                    subscription_id=subscription_id,
+                    progress_callback=progress_callback if ctx is not None else None,
+                    cancellation_token=cancel_token,
+                    credential=_get_lifespan_resource(ctx, "sync_credential"),
+                )
+
+                # Run the test in a thread pool to avoid blocking
+                results = await loop.run_in_executor(_get_executor(ctx), tester.run)
+
+                # Build response
+                duration = time.perf_counter() - start_time
+
+                response = build_latency_response(
+                    success=True,
+                    results=results,
+                    resource_group=tester.resource_group_name,
+                    subscription_id=tester.subscription_id or "",
+                    created_accounts=[a.storage_account for a in tester.created_accounts],
+                    deleted_accounts=tester.deleted_accounts,
+                    failed_deletions=tester.failed_deletions,
+                    warnings=tester.warnings,
+                    duration_seconds=duration,
+                    log_file=tester.log_file,
+                    cancelled=cancel_token.is_cancelled(),
+                    best=tester.best,
+                )
+
+                return _dump(response, pretty=pretty or PRETTY_JSON)
+
+            except Exception as e:
+                # Return error as MCP exception
+                raise RuntimeError(f"Latency test failed: {str(e)}")
+
+            finally:
+                # Clean up cancellation token
+                _active_tokens.pop(test_id, None)
+                cancel_token.close()
+
+    finally:
+        _active_log_files.discard(log_path)
 
 
 # =============================================================================
@@ -0,0 +1,88 @@
+"""Tests for the blob endpoint DNS cache in the latency tester."""
+
+import asyncio
+import socket
+
+import pytest
+
+from azure_latency_mcp import latency_tester
+
+
+class _Clock:
+    """Stands in for time.monotonic so tests can step past the TTL."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(latency_tester.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Hostnames passed to getaddrinfo, in order; each resolves to a fresh address."""
+    calls = []
+
+    def getaddrinfo(host, port, family, type_, proto, flags):
+        calls.append(host)
+        address = f"10.0.0.{len(calls)}"
+        return [(socket.AF_INET, type_, proto, "", (address, port))]
+
+    monkeypatch.setattr(latency_tester.socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(latency_tester, "_dns_cache", {})
+    return calls
+
+
+def test_answers_are_reused_within_the_ttl(clock, lookups):
+    first = latency_tester._cached_resolve("a.example")
+    clock.now += latency_tester.DNS_CACHE_TTL - 1
+
+    assert latency_tester._cached_resolve("a.example") == first
+    assert lookups == ["a.example"]
+
+
+def test_answers_expire_after_the_ttl(clock, lookups):
+    first = latency_tester._cached_resolve("a.example")
+    clock.now += latency_tester.DNS_CACHE_TTL
+
+    assert latency_tester._cached_resolve("a.example") != first
+    assert lookups == ["a.example", "a.example"]
+
+
+def test_oldest_answer_is_evicted_past_the_size_limit(clock, lookups, monkeypatch):
+    monkeypatch.setattr(latency_tester, "DNS_CACHE_SIZE", 2)
+    for host in ("a.example", "b.example"):
+        latency_tester._cached_resolve(host)
+        clock.now += 1
+    # Refreshing a.example makes b.example the oldest answer
+    clock.now += latency_tester.DNS_CACHE_TTL
+    latency_tester._cached_resolve("a.example")
+    latency_tester._cached_resolve("c.example")
+
+    assert list(latency_tester._dns_cache) == ["a.example", "c.example"]
+
+
+def test_failed_lookups_are_not_cached(lookups, monkeypatch):
+    def getaddrinfo(*args):
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    monkeypatch.setattr(latency_tester.socket, "getaddrinfo", getaddrinfo)
+
+    with pytest.raises(socket.gaierror):
+        latency_tester._cached_resolve("missing.example")
+    assert latency_tester._dns_cache == {}
+
+
+def test_prefetch_dns_warms_each_endpoint_once(lookups, monkeypatch):
+    monkeypatch.setattr(latency_tester, "load_blob_endpoints", lambda: {"myregion": "acct.example"})
+
+    asyncio.run(latency_tester.AzureLatencyTester.prefetch_dns(["westeurope", "myregion", "westeurope"]))
+
+    assert sorted(lookups) == ["acct.example", "westeurope.blob.core.windows.net"]
@@ -0,0 +1,56 @@
+"""Tests for the latency aggregation kernels."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from azure_latency_mcp import _kernels, latency_tester
+from azure_latency_mcp.latency_tester import AzureLatencyTester
+
+np = pytest.importorskip("numpy")
+
+# Failed probes are -1; one row each with mixed, no and only successful probes
+LATENCIES = {
+    "westeurope": [12_345_678, -1, 9_876_543, 15_000_000],
+    "eastus": [-1, -1, -1, -1],
+    "northeurope": [20_000_000, 21_500_000, 19_999_999, 22_000_001],
+}
+RETRIES = {"westeurope": 1, "eastus": 4, "northeurope": 0}
+
+
+@pytest.fixture(params=["numpy", "numba"])
+def backend(request, monkeypatch):
+    """Each aggregation backend, installed as latency_tester.aggregate."""
+    if request.param == "numba":
+        kernel = getattr(_kernels, "_aggregate_numba", None)
+        if kernel is None:
+            pytest.skip("numba is not installed")
+    else:
+        kernel = _kernels._aggregate_numpy
+    monkeypatch.setattr(latency_tester, "aggregate", kernel)
+    return kernel
+
+
+def test_backends_agree_including_rows_without_a_valid_probe():
+    if getattr(_kernels, "_aggregate_numba", None) is None:
+        pytest.skip("numba is not installed")
+    samples = np.array(list(LATENCIES.values()), dtype=np.int64)
+
+    expected = _kernels._aggregate_numpy(samples)
+    for got, want in zip(_kernels._aggregate_numba(samples), expected):
+        np.testing.assert_array_equal(got, want)
+    assert [column[1] for column in expected] == [0, 0, 0, 0]
+
+
+def test_summaries_match_the_pure_python_pass(backend):
+    tester = SimpleNamespace(
+        endpoint_map={region: (f"{region}.blob.core.windows.net", None) for region in LATENCIES},
+        _summarize=AzureLatencyTester._summarize,
+    )
+
+    results = AzureLatencyTester._summarize_all(tester, LATENCIES, RETRIES)
+
+    assert results == [
+        AzureLatencyTester._summarize(region, tester.endpoint_map[region][0], lats, RETRIES[region])
+        for region, lats in LATENCIES.items()
+    ]
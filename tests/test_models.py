@@ -0,0 +1,100 @@
+"""Tests for the tool input models and response builders."""
+
+import pytest
+from pydantic import ValidationError
+
+from azure_latency_mcp.latency_tester import AzureLatencyTester
+from azure_latency_mcp.models import TEST_LATENCY_VALIDATOR, LatencyResult, build_latency_response
+
+
+def test_regions_are_stripped_lowercased_and_deduplicated():
+    params = TEST_LATENCY_VALIDATOR.validate_python(
+        {"regions": [" westeurope", "WestEurope ", "eastus", "", "eastus"]}
+    )
+
+    assert params.regions == ["westeurope", "eastus"]
+
+
+def test_malformed_region_names_are_rejected():
+    with pytest.raises(ValidationError, match="Invalid region names: west europe"):
+        TEST_LATENCY_VALIDATOR.validate_python({"regions": ["westeurope", "west europe"]})
+
+
+def test_all_blank_regions_are_rejected():
+    with pytest.raises(ValidationError, match="No valid regions provided after normalization"):
+        TEST_LATENCY_VALIDATOR.validate_python({"regions": ["", "  "]})
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValidationError) as excinfo:
+        TEST_LATENCY_VALIDATOR.validate_python({"regions": ["westeurope"], "region": "eastus"})
+
+    assert [error["type"] for error in excinfo.value.errors()] == ["extra_forbidden"]
+
+
+@pytest.fixture
+def phase3(tmp_path, monkeypatch):
+    """Run a tester's Phase 3 over canned results; returns the finished tester."""
+    testers = []
+
+    def run(results):
+        tester = AzureLatencyTester(log_file=str(tmp_path / "test.log"))
+        testers.append(tester)
+
+        async def run_latency_tests():
+            return list(results)
+
+        monkeypatch.setattr(tester, "_run_latency_tests", run_latency_tests)
+        tester.phase3_run_latency_tests()
+        return tester
+
+    yield run
+    for tester in testers:
+        tester._stop_logging()
+        tester.cancellation_token.close()
+
+
+def _latency_response(tester):
+    """build_latency_response for a tester, as the test_latency tool calls it."""
+    return build_latency_response(
+        success=True,
+        results=tester.results,
+        resource_group=tester.resource_group_name,
+        subscription_id="00000000-0000-0000-0000-000000000000",
+        created_accounts=[],
+        deleted_accounts=[],
+        failed_deletions=[],
+        warnings=[],
+        duration_seconds=1.0,
+        log_file=tester.log_file,
+        best=tester.best,
+    )
+
+
+def test_no_best_region_when_no_region_answered(phase3):
+    tester = phase3([
+        LatencyResult("westeurope", "westeurope.blob.core.windows.net", failed=10),
+        LatencyResult("eastus", "eastus.blob.core.windows.net", failed=10),
+    ])
+
+    latency = _latency_response(tester)["latency_results"]
+
+    assert tester.best is None
+    assert latency["best_region"] is None
+    assert latency["best_latency_ms"] is None
+    assert latency["regions_tested"] == 2
+
+
+def test_fastest_region_is_best_even_with_failed_probes(phase3):
+    tester = phase3([
+        LatencyResult("eastus", "eastus.blob.core.windows.net", 80.0, 95.0, 85.2),
+        LatencyResult("westeurope", "westeurope.blob.core.windows.net", 10.1, 14.0, 11.7, failed=3),
+        LatencyResult("southeastasia", "southeastasia.blob.core.windows.net", failed=10),
+    ])
+
+    latency = _latency_response(tester)["latency_results"]
+
+    assert tester.best.region == "westeurope"
+    assert latency["best_region"] == tester.best.region
+    assert latency["best_latency_ms"] == tester.best.avg_ms == 11.7
+    assert [r["region"] for r in latency["results"]] == ["westeurope", "eastus", "southeastasia"]
@@ -0,0 +1,180 @@
+"""Tests for the azure-pricing skill script."""
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = (
+    Path(__file__).resolve().parents[1]
+    / ".claude" / "skills" / "azure-pricing" / "scripts" / "query_vm_pricing.py"
+)
+
+
+def _load_script(mp, tmp_path_factory, name):
+    """Import the skill script, which is not part of the installed package."""
+    # Numba cache entries record the importing module's name; keep the ones
+    # written under this test's module names away from the user cache
+    mp.setenv("NUMBA_CACHE_DIR", str(tmp_path_factory.mktemp("numba")))
+    spec = importlib.util.spec_from_file_location(name, SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    mp.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def query_vm_pricing(tmp_path_factory):
+    """The skill script as a user with every optional dependency sees it."""
+    with pytest.MonkeyPatch.context() as mp:
+        yield _load_script(mp, tmp_path_factory, "query_vm_pricing")
+
+
+@pytest.fixture(scope="module")
+def query_vm_pricing_sync(tmp_path_factory):
+    """The skill script with httpx unavailable, so pages go through requests."""
+    pytest.importorskip("requests")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "httpx", None)
+        yield _load_script(mp, tmp_path_factory, "query_vm_pricing_sync")
+
+
+def _record(region, location, price_type, product, price, term=None):
+    """One Retail Prices API record, with the API's own field casing."""
+    item = {
+        "armRegionName": region,
+        "location": location,
+        "type": price_type,
+        "productName": product,
+        "retailPrice": price,
+        "serviceName": "Virtual Machines",
+        "armSkuName": "Standard_D4s_v5",
+    }
+    if term is not None:
+        item["reservationTerm"] = term
+    return item
+
+
+LINUX = "Virtual Machines Dsv5 Series"
+WINDOWS = "Virtual Machines Dsv5 Series Windows"
+
+SAMPLE_PAYLOAD = [
+    _record("eastus", "US East", "Consumption", LINUX, 0.192),
+    _record("eastus", "US East", "Consumption", LINUX, 0.230),
+    _record("eastus", "US East", "Consumption", WINDOWS, 0.376),
+    _record("eastus", "US East", "Spot", LINUX, 0.0384),
+    _record("eastus", "US East", "Spot", WINDOWS, 0.0200),
+    _record("eastus", "US East", "Reservation", LINUX, 1040.0, "1 Year"),
+    _record("eastus", "US East", "Reservation", LINUX, 2006.0, "3 Years"),
+    _record("eastus", "US East", "Reservation", WINDOWS, 900.0, "1 Year"),
+    _record("westeurope", "EU West", "Consumption", LINUX, 0.210),
+    _record("westeurope", "EU West", "Reservation", LINUX, 1.0, "5 Years"),
+    _record("", "Global", "Consumption", LINUX, 0.001),
+]
+
+
+@pytest.fixture(params=["kernel", "python"])
+def organize_prices(request, monkeypatch, query_vm_pricing):
+    """organize_prices with the compiled reduction (when available) and without it."""
+    if request.param == "python":
+        monkeypatch.setattr(query_vm_pricing, "_reduce_prices", None)
+    elif query_vm_pricing._reduce_prices is None:
+        pytest.skip("numba is not installed")
+    return query_vm_pricing.organize_prices
+
+
+def test_prices_are_sorted_into_their_slots(organize_prices):
+    prices = organize_prices(SAMPLE_PAYLOAD)
+
+    assert sorted(prices) == ["eastus", "westeurope"]
+    eastus = prices["eastus"]
+    assert eastus.location == "US East"
+    assert eastus.linux_consumption == pytest.approx(0.192)
+    assert eastus.windows_consumption == pytest.approx(0.376)
+    assert eastus.spot == pytest.approx(0.0384)
+    assert eastus.reserved_1yr == pytest.approx(1040.0)
+    assert eastus.reserved_3yr == pytest.approx(2006.0)
+
+
+def test_windows_spot_and_reservations_are_not_reported(organize_prices):
+    windows_only = [item for item in SAMPLE_PAYLOAD if item["productName"] == WINDOWS]
+
+    eastus = organize_prices(windows_only)["eastus"]
+
+    assert eastus.windows_consumption == pytest.approx(0.376)
+    assert eastus.spot is None
+    assert eastus.reserved_1yr is None
+
+
+def test_missing_price_types_are_none(organize_prices):
+    westeurope = organize_prices(SAMPLE_PAYLOAD)["westeurope"]
+
+    assert westeurope.linux_consumption == pytest.approx(0.210)
+    assert westeurope.windows_consumption is None
+    assert westeurope.spot is None
+    assert westeurope.reserved_1yr is None
+    assert westeurope.reserved_3yr is None
+
+
+class _FakeResponse:
+    """Just enough of requests.Response for _fetch_all_sync."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class _FakeSession:
+    """Serves canned pages in order, one per request."""
+
+    def __init__(self, *pages):
+        self.pages = list(pages)
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        return _FakeResponse(self.pages.pop(0))
+
+
+@pytest.fixture(params=["ijson", "whole-page"])
+def fetch_all_sync(request, monkeypatch, query_vm_pricing_sync):
+    """_fetch_all_sync streaming pages through ijson and decoding them whole."""
+    if request.param == "whole-page":
+        monkeypatch.setattr(query_vm_pricing_sync, "ijson", None)
+    elif query_vm_pricing_sync.ijson is None:
+        pytest.skip("ijson is not installed")
+    return query_vm_pricing_sync._fetch_all_sync
+
+
+def test_fallback_client_follows_next_page_link(fetch_all_sync, monkeypatch, query_vm_pricing_sync):
+    first = json.dumps({"Items": SAMPLE_PAYLOAD[:2], "NextPageLink": "https://next"}).encode()
+    second = json.dumps({"Items": SAMPLE_PAYLOAD[2:3], "NextPageLink": None}).encode()
+    monkeypatch.setattr(query_vm_pricing_sync, "_SESSION", _FakeSession(first, second))
+
+    items, complete = fetch_all_sync({})
+
+    assert complete
+    assert items == SAMPLE_PAYLOAD[:3]
+
+
+def test_fallback_client_reports_a_malformed_page(fetch_all_sync, monkeypatch, query_vm_pricing_sync, capsys):
+    first = json.dumps({"Items": SAMPLE_PAYLOAD[:2], "NextPageLink": "https://next"}).encode()
+    monkeypatch.setattr(query_vm_pricing_sync, "_SESSION", _FakeSession(first, b'{"Items": [{"type": '))
+
+    items, complete = fetch_all_sync({})
+
+    assert not complete
+    assert items == SAMPLE_PAYLOAD[:2]
+    assert "Error querying API" in capsys.readouterr().err